@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 
 from fastapi_radixer import Radixer, init_app
+from .cases import init_cases
 from .routes import create_router
 
 
 def get_regular_app() -> FastAPI:
+    # cases are registered on import, apps can be created in a fresh process, e.g. by uvicorn
+    init_cases()
+
     app = FastAPI()
     app.include_router(create_router())
 
@@ -0,0 +1,100 @@
+import math
+import statistics
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi_radixer import NativeRoutingTable, RadixerRoutingTable, RoutingTable
+from fastapi_radixer.parser import parse_route
+from rich import print
+from rich.table import Table
+
+from .apps import get_radixer_app, get_regular_app
+from .cases import init_cases
+from .dump import percentile
+from .routes import create_router, get_cases
+
+_RESULTS: list[tuple[str, dict[str, Any]]] = []
+
+
+def round_stats(data: list[float]) -> dict[str, Any]:
+    times = sorted(data)
+    mean = statistics.fmean(times)
+    # normal approximation of the 95% confidence interval of the mean
+    margin = 1.96 * statistics.stdev(times) / math.sqrt(len(times)) if len(times) > 1 else 0.0
+
+    return {
+        "p50": percentile(times, 50),
+        "p99": percentile(times, 99),
+        "p999": percentile(times, 99.9),
+        "ci95": [mean - margin, mean + margin],
+    }
+
+
+@pytest.fixture
+def bench(request, benchmark) -> Iterator[Any]:
+    # pytest-benchmark reports quartiles only, tail percentiles and a confidence interval
+    # are added to extra_info, so they end up in the json output and saved baselines
+    yield benchmark
+
+    if benchmark.stats and (data := benchmark.stats.stats.data):
+        benchmark.extra_info.update(round_stats(data))
+        _RESULTS.append((request.node.name, benchmark.extra_info))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config) -> None:  # noqa: ARG001
+    if not _RESULTS:
+        return
+
+    table = Table(title="Round time percentiles")
+    table.add_column("Benchmark", overflow="fold")
+
+    for column in ("P50 (µs)", "P99 (µs)", "P99.9 (µs)", "Mean 95% CI (µs)"):
+        table.add_column(column, justify="right")
+
+    for name, info in _RESULTS:
+        low, high = info["ci95"]
+        table.add_row(
+            name,
+            f"{info['p50'] * 1e6:.2f}",
+            f"{info['p99'] * 1e6:.2f}",
+            f"{info['p999'] * 1e6:.2f}",
+            f"{low * 1e6:.2f} - {high * 1e6:.2f}",
+        )
+
+    print(table)
+
+
+@pytest.fixture(scope="session")
+def cases() -> list[tuple[str, str]]:
+    init_cases()
+    return list(get_cases())
+
+
+@pytest.fixture(scope="session", params=["python", "native"])
+def routing_table(request) -> RadixerRoutingTable:
+    if request.param == "native":
+        if NativeRoutingTable is None:
+            pytest.skip("native extension is not built")
+
+        table = NativeRoutingTable()
+    else:
+        table = RoutingTable()
+
+    for route in create_router().routes:
+        if decl := parse_route(route):
+            table.add_route(decl)
+
+    table.prepare()
+    return table
+
+
+@pytest.fixture(scope="session")
+def regular_app() -> FastAPI:
+    return get_regular_app()
+
+
+@pytest.fixture(scope="session")
+def radixer_app() -> FastAPI:
+    return get_radixer_app()
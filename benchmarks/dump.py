@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+import statistics
 from collections import defaultdict
 from dataclasses import dataclass
 from itertools import chain
@@ -19,6 +21,9 @@ class CaseResult:
     max: float
     mean: float
     median: float
+    stdev: float
+    p99: float
+    p999: float
     total: float
 
 
@@ -36,22 +41,26 @@ def _get_median(times: list[float]) -> float:
         return (times[mid - 1] + times[mid]) / 2
 
 
-def _min(times: list[float]) -> float:
-    return max(times[:5])
+def percentile(times: list[float], q: float) -> float:
+    # nearest-rank percentile of sorted times
+    return times[min(len(times) - 1, max(0, math.ceil(q / 100 * len(times)) - 1))]
 
 
-def _max(times: list[float]) -> float:
-    return min(times[-5:])
+def _get_stdev(times: list[float]) -> float:
+    return statistics.stdev(times) if len(times) > 1 else 0.0
 
 
 def benchmark_results_to_case_result(results: list[BenchmarkResult]) -> CaseResult:
     times = sorted(r.elapsed for r in results)
 
     return CaseResult(
-        min=_min(times),
-        max=_max(times),
+        min=times[0],
+        max=times[-1],
         mean=_get_mean(times),
         median=_get_median(times),
+        stdev=_get_stdev(times),
+        p99=percentile(times, 99),
+        p999=percentile(times, 99.9),
         total=sum(times),
     )
 
@@ -81,7 +90,7 @@ def _get_relative_text(value: float, best: float) -> Text:
     if value == best:
         return Text(f"{value:.2f} (1.00)", style="green")
     else:
-        ratio = value / best
+        ratio = value / best if best else math.inf
         return Text(f"{value:.2f} ({ratio:.2f})", style="red")
 
 
@@ -89,16 +98,22 @@ def display_results(case: str | None, groups: set[str], results: dict[str, CaseR
     table = Table(title=f"Results for case: {case or 'all'}")
 
     table.add_column("Group")
-    table.add_column("Min (ms)", justify="right")
-    table.add_column("Max (ms)", justify="right")
-    table.add_column("Mean (ms)", justify="right")
-    table.add_column("Median (ms)", justify="right")
-    table.add_column("Total (ms)", justify="right")
+    table.add_column("Min (µs)", justify="right")
+    table.add_column("Max (µs)", justify="right")
+    table.add_column("Mean (µs)", justify="right")
+    table.add_column("Median (µs)", justify="right")
+    table.add_column("Stdev (µs)", justify="right")
+    table.add_column("P99 (µs)", justify="right")
+    table.add_column("P99.9 (µs)", justify="right")
+    table.add_column("Total (µs)", justify="right")
 
     best_min = min((r.min for r in results.values()), default=0)
     best_max = min((r.max for r in results.values()), default=0)
     best_mean = min((r.mean for r in results.values()), default=0)
     best_median = min((r.median for r in results.values()), default=0)
+    best_stdev = min((r.stdev for r in results.values()), default=0)
+    best_p99 = min((r.p99 for r in results.values()), default=0)
+    best_p999 = min((r.p999 for r in results.values()), default=0)
     best_total = min((r.total for r in results.values()), default=0)
 
     for group in sorted(groups):
@@ -110,6 +125,9 @@ def display_results(case: str | None, groups: set[str], results: dict[str, CaseR
             _get_relative_text(r.max, best_max),
             _get_relative_text(r.mean, best_mean),
             _get_relative_text(r.median, best_median),
+            _get_relative_text(r.stdev, best_stdev),
+            _get_relative_text(r.p99, best_p99),
+            _get_relative_text(r.p999, best_p999),
             _get_relative_text(r.total, best_total),
         )
 
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich import print
+from rich.table import Table
+
+from .cases import init_cases
+from .dump import percentile
+from .routes import get_cases
+
+_APPS = {
+    "regular": "benchmarks.apps:get_regular_app",
+    "radixer": "benchmarks.apps:get_radixer_app",
+}
+
+
+@dataclass
+class LoadResult:
+    app: str
+    workers: int
+    concurrency: int
+    requests: int
+    errors: int
+    rps: float
+    # latencies in seconds
+    p50: float
+    p99: float
+    p999: float
+    # server cpu time (user + system) of all processes per request
+    cpu_per_request: float
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids = [pid]
+
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        children = (task / "children").read_text().split()
+        pids.extend(pid for child in children for pid in _process_tree(int(child)))
+
+    return pids
+
+
+def _cpu_time(pid: int) -> float:
+    # utime and stime of the whole uvicorn process tree, linux only
+    ticks = 0
+
+    for child in _process_tree(pid):
+        try:
+            fields = Path(f"/proc/{child}/stat").read_text().rpartition(")")[2].split()
+        except FileNotFoundError:
+            continue
+
+        ticks += int(fields[11]) + int(fields[12])
+
+    return ticks / os.sysconf("SC_CLK_TCK")
+
+
+def _start_server(app: str, port: int, workers: int) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "--factory",
+            _APPS[app],
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--loop",
+            "uvloop",
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+    )
+
+
+def _wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+    msg = f"Server on port {port} did not start in {timeout}s"
+    raise TimeoutError(msg)
+
+
+def _parse_head(head: bytes) -> tuple[int, int]:
+    status_line, *headers = head.rstrip().split(b"\r\n")
+    length = 0
+
+    for header in headers:
+        name, _, value = header.partition(b":")
+
+        if name.lower() == b"content-length":
+            length = int(value)
+
+    return int(status_line.split(b" ")[1]), length
+
+
+async def _connection(
+    port: int,
+    requests: list[bytes],
+    offset: int,
+    deadline: float,
+    latencies: list[float],
+) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    errors = 0
+    i = offset
+
+    # keep-alive connection, one request in flight at a time
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(requests[i % len(requests)])
+
+        status, length = _parse_head(await reader.readuntil(b"\r\n\r\n"))
+        await reader.readexactly(length)
+
+        latencies.append(time.perf_counter() - start)
+        errors += not 200 <= status < 300  # noqa: PLR2004
+        i += 1
+
+    writer.close()
+    return errors
+
+
+async def _generate_load(
+    port: int, concurrency: int, duration: float, requests: list[bytes]
+) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+
+    errors = await asyncio.gather(
+        *(_connection(port, requests, i, deadline, latencies) for i in range(concurrency)),
+    )
+
+    return latencies, sum(errors)
+
+
+def _load_process(port: int, concurrency: int, duration: float) -> tuple[list[float], int]:
+    init_cases()
+    requests = [
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Length: 0\r\n\r\n".encode()
+        for method, path in get_cases()
+    ]
+
+    try:
+        import uvloop  # noqa: PLC0415
+    except ImportError:
+        return asyncio.run(_generate_load(port, concurrency, duration, requests))
+
+    return uvloop.run(_generate_load(port, concurrency, duration, requests))
+
+
+def run_load(port: int, concurrency: int, duration: float, processes: int) -> tuple[list[float], int]:
+    # a single python client saturates one core, so the load is spread over several processes
+    per_process = [concurrency // processes + (i < concurrency % processes) for i in range(processes)]
+
+    with ProcessPoolExecutor(processes) as executor:
+        futures = [executor.submit(_load_process, port, n, duration) for n in per_process if n]
+        results = [future.result() for future in futures]
+
+    return [latency for latencies, _ in results for latency in latencies], sum(errors for _, errors in results)
+
+
+def measure(app: str, workers: int, concurrency: int, duration: float, processes: int) -> LoadResult:  # noqa: PLR0913
+    port = _free_port()
+    server = _start_server(app, port, workers)
+
+    try:
+        _wait_ready(port)
+        # warm up, so imports and first request setup are not measured
+        run_load(port, concurrency, min(duration, 2.0), processes)
+
+        cpu = _cpu_time(server.pid)
+        start = time.perf_counter()
+        latencies, errors = run_load(port, concurrency, duration, processes)
+        elapsed = time.perf_counter() - start
+        cpu = _cpu_time(server.pid) - cpu
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+
+    return LoadResult(
+        app=app,
+        workers=workers,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        rps=len(latencies) / elapsed,
+        p50=percentile(latencies, 50),
+        p99=percentile(latencies, 99),
+        p999=percentile(latencies, 99.9),
+        cpu_per_request=cpu / len(latencies),
+    )
+
+
+def show(results: list[LoadResult]) -> None:
+    table = Table(title="End-to-end throughput under uvicorn")
+
+    for column in ("App", "Workers", "Concurrency", "RPS", "P50 (ms)", "P99 (ms)", "P99.9 (ms)", "CPU/req (µs)"):
+        table.add_column(column, justify="left" if column == "App" else "right")
+
+    for r in results:
+        table.add_row(
+            r.app,
+            str(r.workers),
+            str(r.concurrency),
+            f"{r.rps:,.0f}",
+            f"{r.p50 * 1e3:.2f}",
+            f"{r.p99 * 1e3:.2f}",
+            f"{r.p999 * 1e3:.2f}",
+            f"{r.cpu_per_request * 1e6:.1f}",
+        )
+
+    print(table)
+
+    if any(r.errors for r in results):
+        print("[red]some requests failed, check the server output[/red]")
+
+
+def main(
+    workers: Annotated[list[int], typer.Option("--workers", help="Uvicorn worker counts")] = [1, 4],  # noqa: B006
+    concurrency: Annotated[list[int], typer.Option("--concurrency", help="Open connections")] = [16, 64],  # noqa: B006
+    duration: Annotated[float, typer.Option(help="Seconds of load per run")] = 10.0,
+    load_processes: Annotated[int, typer.Option(help="Load generator processes")] = 2,
+    json_path: Annotated[Path | None, typer.Option("--json")] = None,
+) -> None:
+    results = [measure(app, n, c, duration, load_processes) for n in workers for c in concurrency for app in _APPS]
+
+    show(results)
+
+    if json_path:
+        json_path.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    typer.run(main)
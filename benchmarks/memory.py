@@ -0,0 +1,92 @@
+import gc
+import json
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich import print
+from rich.table import Table
+from starlette.routing import Route
+
+from fastapi_radixer import RoutingTable
+from fastapi_radixer.parser import parse_route
+
+from .synthetic import RouteSetSpec, create_synthetic_routes, generate_routes
+
+
+@dataclass
+class MemoryResult:
+    routes: int
+    # memory kept by the prepared table, route objects themselves are not counted
+    retained: int
+    peak: int
+
+    @property
+    def per_route(self) -> float:
+        return self.retained / self.routes
+
+
+def measure(routes: list[Route]) -> MemoryResult:
+    # only the python engine is measured, tracemalloc doesn't see allocations of the native extension
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        table = RoutingTable()
+
+        for route in routes:
+            if decl := parse_route(route):
+                table.add_route(decl)
+
+        table.prepare()
+        gc.collect()
+
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del table
+    return MemoryResult(routes=len(routes), retained=retained, peak=peak)
+
+
+def show(results: list[MemoryResult]) -> None:
+    table = Table(title="Python routing table memory")
+
+    for column in ("Routes", "Retained (MiB)", "Peak (MiB)", "Bytes per route"):
+        table.add_column(column, justify="right")
+
+    for r in results:
+        table.add_row(
+            f"{r.routes:,}",
+            f"{r.retained / 2**20:.1f}",
+            f"{r.peak / 2**20:.1f}",
+            f"{r.per_route:,.0f}",
+        )
+
+    print(table)
+
+
+def main(
+    sizes: Annotated[list[int], typer.Option("--size", help="Route counts to measure")] = [1_000, 10_000, 100_000],  # noqa: B006
+    depth: int = 6,
+    branching: int = 12,
+    param_density: float = 0.3,
+    seed: int = 0,
+    json_path: Annotated[Path | None, typer.Option("--json")] = None,
+) -> None:
+    results = []
+
+    for size in sizes:
+        spec = RouteSetSpec(routes=size, depth=depth, branching=branching, param_density=param_density, seed=seed)
+        results.append(measure(create_synthetic_routes(generate_routes(spec))))
+
+    show(results)
+
+    if json_path:
+        json_path.write_text(json.dumps([asdict(r) | {"per_route": r.per_route} for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    typer.run(main)
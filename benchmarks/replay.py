@@ -0,0 +1,222 @@
+import asyncio
+import csv
+import importlib
+import json
+import re
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Annotated
+from urllib.parse import unquote
+
+import typer
+from fastapi import FastAPI
+from fastapi_radixer import Radixer, init_app
+from rich import print
+from rich.table import Table
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Scope
+
+from .dump import percentile
+from .runner import BenchmarkResult, run_benchmark
+
+# request line of the common and combined log formats, e.g. "GET /users/1?x=1 HTTP/1.1"
+_LOG_LINE_RE = re.compile(r'"(?P<method>[A-Z]+) (?P<target>\S+) HTTP/[\d.]+"')
+
+NOT_FOUND = "<not found>"
+
+
+def _split_target(target: str) -> str:
+    path, _, _ = target.partition("?")
+    return unquote(path) or "/"
+
+
+def _read_access_log(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    for line in lines:
+        if match := _LOG_LINE_RE.search(line):
+            yield match["method"], _split_target(match["target"])
+
+
+def _read_csv(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    for row in csv.reader(lines):
+        # the header row, if any, is skipped as it's not a method
+        if len(row) >= 2 and row[0].isupper():  # noqa: PLR2004
+            yield row[0], _split_target(row[1])
+
+
+def _read_jsonl(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            yield record["method"].upper(), _split_target(record["path"])
+
+
+def read_records(path: Path) -> Iterator[tuple[str, str]]:
+    # records are streamed, so logs don't have to fit into memory
+    reader = {".csv": _read_csv, ".jsonl": _read_jsonl}.get(path.suffix, _read_access_log)
+
+    with path.open() as file:
+        yield from reader(file)
+
+
+def _scope(method: str, path: str) -> Scope:
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "headers": [],
+        "query_string": b"",
+    }
+
+
+class TemplateResolver:
+    # the route template of a request is resolved by the regular starlette scan, outside of the timings
+    def __init__(self, routes: list[BaseRoute]) -> None:
+        self.routes = routes
+        self.templates: dict[tuple[str, str], str] = {}
+
+    def __call__(self, method: str, path: str) -> str:
+        key = method, path
+
+        if key not in self.templates:
+            self.templates[key] = self.resolve(_scope(method, path))
+
+        return self.templates[key]
+
+    def resolve(self, scope: Scope) -> str:
+        if (template := self.match(scope)) is not None:
+            return template
+
+        path: str = scope["path"]
+
+        # starlette redirects to the path with the trailing slash toggled, if it matches
+        if path != "/":
+            toggled = path.rstrip("/") if path.endswith("/") else f"{path}/"
+
+            if (template := self.match({**scope, "path": toggled})) is not None:
+                return f"<redirect> {template}"
+
+        return NOT_FOUND
+
+    def match(self, scope: Scope) -> str | None:
+        partial = None
+
+        for route in self.routes:
+            match, _ = route.matches(scope)
+
+            if match == Match.FULL:
+                return f"{scope['method']} {getattr(route, 'path_format', route)}"
+
+            if match == Match.PARTIAL and partial is None:
+                partial = route
+
+        if partial is not None:
+            return f"<method not allowed> {getattr(partial, 'path_format', partial)}"
+
+        return None
+
+
+async def _receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(_: Message) -> None:
+    pass
+
+
+async def replay(
+    results: list[BenchmarkResult],
+    group: str,
+    app: ASGIApp,
+    records: Iterable[tuple[str, str]],
+    resolve: Callable[[str, str], str],
+) -> None:
+    for method, path in records:
+        await run_benchmark(results, group, resolve(method, path), app, _scope(method, path), _receive, _send)
+
+
+def _load_factory(spec: str) -> Callable[[], FastAPI]:
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def show_replay(results: dict[str, list[BenchmarkResult]], top: int) -> None:
+    groups = [*results]
+    by_template: dict[str, dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
+
+    for group, group_results in results.items():
+        for r in group_results:
+            by_template[r.case][group].append(r.elapsed)
+
+    table = Table(title="Replay latency by route template")
+    table.add_column("Template", overflow="fold")
+    table.add_column("Requests", justify="right")
+
+    for group in groups:
+        table.add_column(f"{group} p50 (µs)", justify="right")
+        table.add_column(f"{group} p99 (µs)", justify="right")
+
+    # the most requested templates first
+    templates = sorted(by_template, key=lambda case: -len(by_template[case][groups[0]]))
+
+    rows = [(template, by_template[template]) for template in templates[:top]]
+    rows.append(("all", {group: [r.elapsed for r in results[group]] for group in groups}))
+
+    for template, times_by_group in rows:
+        row = [template, f"{len(times_by_group[groups[0]]):,}"]
+
+        for group in groups:
+            times = sorted(times_by_group[group])
+            row.extend((f"{percentile(times, 50) / 1e3:.2f}", f"{percentile(times, 99) / 1e3:.2f}"))
+
+        table.add_row(*row)
+
+    print(table)
+
+    # throughput of the dispatch alone, reading the log and resolving templates are not timed
+    for group in groups:
+        elapsed = sum(r.elapsed for r in results[group]) / 1e9
+        print(f"{group}: {len(results[group]) / elapsed:,.0f} requests/s over {len(results[group]):,} requests")
+
+
+def main(
+    log: Annotated[Path, typer.Argument(help="Access log, .csv or .jsonl file of (method, path) records")],
+    app_factory: Annotated[str, typer.Option(help="module:function returning a FastAPI app")] = (
+        "benchmarks.apps:get_regular_app"
+    ),
+    limit: Annotated[int | None, typer.Option(help="Replay only the first N records")] = None,
+    warmup: int = 1_000,
+    top: Annotated[int, typer.Option(help="Number of templates to show")] = 20,
+) -> None:
+    factory = _load_factory(app_factory)
+
+    regular_app = factory()
+    radixer_app = factory()
+    init_app(radixer_app, Radixer())
+
+    resolve = TemplateResolver(regular_app.router.routes)
+    results: dict[str, list[BenchmarkResult]] = {}
+
+    async def _run() -> None:
+        for group, app in (("regular", regular_app), ("radixer", radixer_app)):
+            await replay([], group, app.router, islice(read_records(log), warmup), resolve)
+
+            results[group] = []
+            await replay(results[group], group, app.router, islice(read_records(log), limit), resolve)
+
+    asyncio.run(_run())
+    show_replay(results, top)
+
+
+if __name__ == "__main__":
+    typer.run(main)
+
+
+__all__ = [
+    "TemplateResolver",
+    "read_records",
+    "replay",
+]
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from dataclasses import dataclass
 from functools import partial
@@ -89,7 +90,5 @@ async def run_benchmarks() -> None:
     show_results(regular_results, radixer_results)
 
 
-# if __name__ == "__main__":
-import asyncio
-
-asyncio.run(run_benchmarks())
+if __name__ == "__main__":
+    asyncio.run(run_benchmarks())
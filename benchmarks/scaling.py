@@ -0,0 +1,193 @@
+import json
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+from fastapi_radixer import NativeRoutingTable, RadixerRoutingTable, RoutingTable
+from fastapi_radixer.parser import parse_route, prepare_path
+from rich import print
+from rich.table import Table
+from starlette.routing import Match, Route
+
+from .dump import percentile
+from .synthetic import RouteSetSpec, WorkloadSpec, create_synthetic_routes, generate_routes, generate_workload
+
+type Lookup = Callable[[str, str], Any]
+
+
+@dataclass
+class ScalingResult:
+    engine: str
+    routes: int
+    build: float
+    # per lookup latency in seconds
+    mean: float
+    p50: float
+    p99: float
+    # the regular router is too slow to replay the whole workload on large route sets
+    requests: int
+
+
+def _build_regular(routes: list[Route]) -> Lookup:
+    # the same linear scan as in starlette router
+    def _lookup(method: str, path: str) -> Any:
+        scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+
+        for route in routes:
+            match, _ = route.matches(scope)
+
+            if match == Match.FULL:
+                return route
+
+        return None
+
+    return _lookup
+
+
+def _build_table(factory: Callable[[], RadixerRoutingTable]) -> Callable[[list[Route]], Lookup]:
+    def _build(routes: list[Route]) -> Lookup:
+        table = factory()
+
+        for route in routes:
+            if decl := parse_route(route):
+                table.add_route(decl)
+
+        table.prepare()
+        lookup = table.lookup
+
+        return lambda method, path: lookup(method, prepare_path(path))
+
+    return _build
+
+
+def engines() -> dict[str, Callable[[list[Route]], Lookup]]:
+    builders = {"regular": _build_regular, "python": _build_table(RoutingTable)}
+
+    if NativeRoutingTable is not None:
+        builders["native"] = _build_table(NativeRoutingTable)
+
+    return builders
+
+
+def measure(
+    engine: str,
+    routes: list[Route],
+    workload: list[tuple[str, str]],
+    budget: float,
+) -> ScalingResult:
+    start = time.perf_counter()
+    lookup = engines()[engine](routes)
+    build = time.perf_counter() - start
+
+    times = []
+    deadline = time.perf_counter() + budget
+
+    for method, path in workload:
+        start = time.perf_counter()
+        lookup(method, path)
+        times.append(time.perf_counter() - start)
+
+        if start > deadline:
+            break
+
+    times.sort()
+
+    return ScalingResult(
+        engine=engine,
+        routes=len(routes),
+        build=build,
+        mean=sum(times) / len(times),
+        p50=percentile(times, 50),
+        p99=percentile(times, 99),
+        requests=len(times),
+    )
+
+
+def show(results: list[ScalingResult]) -> None:
+    table = Table(title="Lookup latency and build time by route count")
+
+    for column in ("Engine", "Routes", "Build (ms)", "Mean (µs)", "P50 (µs)", "P99 (µs)", "Requests"):
+        table.add_column(column, justify="left" if column == "Engine" else "right")
+
+    for r in results:
+        table.add_row(
+            r.engine,
+            f"{r.routes:,}",
+            f"{r.build * 1e3:.1f}",
+            f"{r.mean * 1e6:.2f}",
+            f"{r.p50 * 1e6:.2f}",
+            f"{r.p99 * 1e6:.2f}",
+            f"{r.requests:,}",
+        )
+
+    print(table)
+
+
+def plot(results: list[ScalingResult], path: Path) -> None:
+    try:
+        import matplotlib as mpl  # noqa: PLC0415
+
+        mpl.use("Agg")
+        import matplotlib.pyplot as plt  # noqa: PLC0415
+    except ImportError:
+        print("[red]matplotlib is not installed, skipping the plot[/red]")
+        return
+
+    fig, (latency, build) = plt.subplots(1, 2, figsize=(12, 5))
+
+    for engine in dict.fromkeys(r.engine for r in results):
+        rows = [r for r in results if r.engine == engine]
+        sizes = [r.routes for r in rows]
+
+        latency.plot(sizes, [r.p50 * 1e6 for r in rows], marker="o", label=f"{engine} p50")
+        latency.plot(sizes, [r.p99 * 1e6 for r in rows], marker="x", linestyle="--", label=f"{engine} p99")
+        build.plot(sizes, [r.build * 1e3 for r in rows], marker="o", label=engine)
+
+    for ax, title, unit in ((latency, "Lookup latency", "µs"), (build, "Build time", "ms")):
+        ax.set(title=title, xlabel="routes", ylabel=unit, xscale="log", yscale="log")
+        ax.legend()
+
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def main(
+    sizes: Annotated[list[int], typer.Option("--size", help="Route counts to benchmark")] = [1_000, 10_000, 100_000],  # noqa: B006
+    depth: int = 6,
+    branching: int = 12,
+    param_density: float = 0.3,
+    requests: int = 20_000,
+    hit_ratio: float = 0.9,
+    zipf_s: float = 1.1,
+    seed: int = 0,
+    budget: Annotated[float, typer.Option(help="Max seconds of lookups per engine and size")] = 10.0,
+    json_path: Annotated[Path | None, typer.Option("--json")] = None,
+    plot_path: Annotated[Path | None, typer.Option("--plot")] = None,
+) -> None:
+    results = []
+
+    for size in sizes:
+        spec = RouteSetSpec(routes=size, depth=depth, branching=branching, param_density=param_density, seed=seed)
+        synthetic = generate_routes(spec)
+        routes = create_synthetic_routes(synthetic)
+        workload = generate_workload(
+            synthetic,
+            WorkloadSpec(requests=requests, hit_ratio=hit_ratio, zipf_s=zipf_s, seed=seed),
+        )
+
+        results.extend(measure(engine, routes, workload, budget) for engine in engines())
+
+    show(results)
+
+    if json_path:
+        json_path.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+    if plot_path:
+        plot(results, plot_path)
+
+
+if __name__ == "__main__":
+    typer.run(main)
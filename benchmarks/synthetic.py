@@ -0,0 +1,143 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+from itertools import accumulate
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+type ParamTypes = dict[str, float]
+
+_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH"]
+_METHOD_WEIGHTS = [60, 15, 10, 10, 5]
+
+
+@dataclass(frozen=True)
+class RouteSetSpec:
+    routes: int = 1_000
+    # max number of segments in a route path
+    depth: int = 5
+    # number of distinct static segments at each level
+    branching: int = 10
+    # probability of a segment being a param
+    param_density: float = 0.3
+    # relative weights of param types, "path" params are only used as the last segment
+    param_types: ParamTypes = field(default_factory=lambda: {"int": 4, "uuid": 2, "str": 3, "path": 1})
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    requests: int = 10_000
+    # share of requests that match a route, the rest are misses
+    hit_ratio: float = 0.9
+    # zipf exponent of route popularity, 0 means uniform
+    zipf_s: float = 1.1
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class SyntheticRoute:
+    method: str
+    path: str
+
+
+def _segment(rng: random.Random, spec: RouteSetSpec, level: int, *, last: bool) -> str:
+    # the first segment is always static, like a resource name, otherwise a single "/{name:path}"
+    # route would catch most of the paths
+    if not level or rng.random() >= spec.param_density:
+        return f"r{level}n{rng.randrange(spec.branching)}"
+
+    types = [name for name in spec.param_types if last or name != "path"]
+    (param_type,) = rng.choices(types, weights=[spec.param_types[name] for name in types])
+
+    return f"{{p{level}:{param_type}}}"
+
+
+def generate_routes(spec: RouteSetSpec) -> list[SyntheticRoute]:
+    rng = random.Random(spec.seed)
+    routes: dict[tuple[str, str], SyntheticRoute] = {}
+
+    # the space of distinct paths is bounded by branching and depth, so attempts are bounded too
+    for _ in range(spec.routes * 20):
+        if len(routes) >= spec.routes:
+            break
+
+        depth = rng.randint(1, spec.depth)
+        segments = [_segment(rng, spec, level, last=level == depth - 1) for level in range(depth)]
+        (method,) = rng.choices(_METHODS, weights=_METHOD_WEIGHTS)
+        path = "/" + "/".join(segments)
+
+        routes.setdefault((method, path), SyntheticRoute(method=method, path=path))
+
+    if len(routes) < spec.routes:
+        msg = f"Can't generate {spec.routes} distinct routes, increase depth or branching"
+        raise ValueError(msg)
+
+    return [*routes.values()]
+
+
+def _param_value(rng: random.Random, param_type: str) -> str:
+    match param_type:
+        case "int":
+            return str(rng.randrange(1_000_000))
+        case "uuid":
+            return str(uuid.UUID(int=rng.getrandbits(128)))
+        case "path":
+            return "/".join(f"d{rng.randrange(100)}" for _ in range(rng.randint(1, 3)))
+        case _:
+            return f"v{rng.randrange(1_000_000)}"
+
+
+def render_path(rng: random.Random, path: str) -> str:
+    segments = []
+
+    for segment in path.split("/"):
+        if segment.startswith("{"):
+            _, param_type = segment[1:-1].split(":")
+            segments.append(_param_value(rng, param_type))
+        else:
+            segments.append(segment)
+
+    return "/".join(segments)
+
+
+def generate_workload(routes: list[SyntheticRoute], spec: WorkloadSpec) -> list[tuple[str, str]]:
+    rng = random.Random(spec.seed)
+
+    # popularity rank is shuffled, so popular routes are spread over the whole route set
+    ranked = rng.sample(routes, len(routes))
+    cum_weights = [*accumulate(1 / rank**spec.zipf_s for rank in range(1, len(ranked) + 1))]
+
+    requests = []
+    for route in rng.choices(ranked, cum_weights=cum_weights, k=spec.requests):
+        path = render_path(rng, route.path)
+
+        if rng.random() >= spec.hit_ratio:
+            # either an unknown first segment or an unknown trailing segment
+            path = f"/missing{path}" if rng.random() < 0.5 else f"{path}/~missing"  # noqa: PLR2004
+
+        requests.append((route.method, path))
+
+    return requests
+
+
+async def _endpoint(_: Request) -> Response:
+    return Response()
+
+
+def create_synthetic_routes(routes: list[SyntheticRoute]) -> list[Route]:
+    # plain starlette routes, FastAPI routes only add dependency resolution, which is not routing
+    return [Route(route.path, _endpoint, methods=[route.method]) for route in routes]
+
+
+__all__ = [
+    "RouteSetSpec",
+    "SyntheticRoute",
+    "WorkloadSpec",
+    "create_synthetic_routes",
+    "generate_routes",
+    "generate_workload",
+    "render_path",
+]
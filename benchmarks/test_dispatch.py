@@ -0,0 +1,38 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from starlette.types import Message
+
+from .routes import is_success_msg
+
+
+@pytest.fixture(scope="module")
+def runner() -> Iterator[asyncio.Runner]:
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+@pytest.mark.parametrize("app_name", ["regular_app", "radixer_app"])
+def test_asgi_dispatch(request, bench, runner, cases, app_name):
+    router = request.getfixturevalue(app_name).router
+    messages: list[Message] = []
+
+    async def _receive() -> Message:
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    async def _send(message: Message) -> None:
+        messages.append(message)
+
+    scopes = [
+        {"type": "http", "method": method, "path": path, "headers": [], "query_string": b""} for method, path in cases
+    ]
+
+    async def _dispatch() -> None:
+        for scope in scopes:
+            await router(scope.copy(), _receive, _send)
+
+    # the event loop is entered once per round, so its overhead is spread over all cases
+    bench(lambda: runner.run(_dispatch()))
+
+    assert sum(map(is_success_msg, messages)) >= len(scopes)
@@ -0,0 +1,49 @@
+from starlette.routing import Match
+
+from fastapi_radixer.parser import prepare_path
+
+from .routes import create_router
+
+# a round is one pass over all cases, so percentiles are not skewed by the timer resolution
+
+
+def test_routing_table_lookup(bench, routing_table, cases):
+    lookup = routing_table.lookup
+    pairs = [(method, prepare_path(path)) for method, path in cases]
+
+    def _run() -> None:
+        for method, path in pairs:
+            lookup(method, path)
+
+    bench(_run)
+
+    assert all(lookup(method, path) for method, path in pairs)
+
+
+def test_routing_table_miss(bench, routing_table, cases):
+    lookup = routing_table.lookup
+    pairs = [(method, f"missing/{prepare_path(path)}") for method, path in cases]
+
+    def _run() -> None:
+        for method, path in pairs:
+            lookup(method, path)
+
+    bench(_run)
+
+    assert not any(lookup(method, path) for method, path in pairs)
+
+
+def test_starlette_lookup(bench, cases):
+    routes = create_router().routes
+    scopes = [{"type": "http", "method": method, "path": path, "root_path": ""} for method, path in cases]
+
+    # the same linear scan as in starlette router, without the dispatch
+    def _run() -> None:
+        for scope in scopes:
+            for route in routes:
+                match, _ = route.matches(scope)
+
+                if match == Match.FULL:
+                    break
+
+    bench(_run)
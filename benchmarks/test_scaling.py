@@ -0,0 +1,36 @@
+import pytest
+
+from fastapi_radixer import NativeRoutingTable, RoutingTable
+from fastapi_radixer.parser import parse_route, prepare_path
+
+from .synthetic import RouteSetSpec, WorkloadSpec, create_synthetic_routes, generate_routes, generate_workload
+
+
+@pytest.fixture(scope="module", params=[1_000, 10_000])
+def synthetic(request):
+    routes = generate_routes(RouteSetSpec(routes=request.param, depth=6, branching=12))
+    workload = generate_workload(routes, WorkloadSpec(requests=1_000))
+
+    return create_synthetic_routes(routes), [(method, prepare_path(path)) for method, path in workload]
+
+
+@pytest.mark.parametrize("engine", ["python", "native"])
+def test_synthetic_lookup(bench, synthetic, engine):
+    if engine == "native" and NativeRoutingTable is None:
+        pytest.skip("native extension is not built")
+
+    routes, workload = synthetic
+    table = NativeRoutingTable() if engine == "native" else RoutingTable()
+
+    for route in routes:
+        if decl := parse_route(route):
+            table.add_route(decl)
+
+    table.prepare()
+    lookup = table.lookup
+
+    def _run() -> None:
+        for method, path in workload:
+            lookup(method, path)
+
+    bench(_run)
@@ -1,6 +1,26 @@
-from ._radixer import Radixer, init_app
+from ._base import RadixerRoutingTable
+from ._batch import lookup_stream
+from ._cache import CacheStats, ClockCache, LRUCache, create_cache
+from ._native import NativeRoutingTable, default_routing_table, has_native
+from ._radixer import CoverageReport, Radixer, RebuildInfo, init_app
+from ._routing_table import RoutingTable
+from .parser import register_param_type, unregister_param_type
 
 __all__ = [
+    "CacheStats",
+    "ClockCache",
+    "CoverageReport",
+    "LRUCache",
+    "NativeRoutingTable",
     "Radixer",
+    "RadixerRoutingTable",
+    "RebuildInfo",
+    "RoutingTable",
+    "create_cache",
+    "default_routing_table",
+    "has_native",
     "init_app",
+    "lookup_stream",
+    "register_param_type",
+    "unregister_param_type",
 ]
@@ -1,11 +1,14 @@
-from typing import Any, Protocol
+from collections.abc import Callable, Iterable
+from typing import Any, Protocol, cast
 
 from starlette.routing import Route
 
-from .types import RouteDecl
+from .types import Methods, RouteDecl
 
 
 class RadixerRoutingTable(Protocol):
+    # the builtin tables also have lookup_many(), allowed_methods() and empty_copy(), they are optional
+    # for other tables, see the helpers below
     def add_route(self, route: RouteDecl) -> None:
         pass
 
@@ -16,6 +19,36 @@ class RadixerRoutingTable(Protocol):
         pass
 
 
+def table_factory(routing_table: RadixerRoutingTable) -> Callable[[], RadixerRoutingTable]:
+    # a new empty table with the same settings, used for rebuilds and mounted apps,
+    # tables without empty_copy() are created with their default settings
+    return getattr(routing_table, "empty_copy", None) or cast("Callable[[], RadixerRoutingTable]", type(routing_table))
+
+
+def allowed_methods(routing_table: RadixerRoutingTable, path: str) -> Methods:
+    # tables without allowed_methods() answer a method mismatch with 404 instead of 405
+    if (allowed := getattr(routing_table, "allowed_methods", None)) is None:
+        return set()
+
+    return allowed(path)
+
+
+def lookup_many(
+    routing_table: RadixerRoutingTable,
+    pairs: Iterable[tuple[str, str]],
+    threads: int = 1,
+) -> list[tuple[Route, dict[str, Any]] | None]:
+    # params are returned as raw strings, tables without lookup_many() are looked up pair by pair
+    # and return converted params
+    if (lookup := getattr(routing_table, "lookup_many", None)) is None:
+        return [routing_table.lookup(method, path) for method, path in pairs]
+
+    return lookup(pairs, threads)
+
+
 __all__ = [
     "RadixerRoutingTable",
+    "allowed_methods",
+    "lookup_many",
+    "table_factory",
 ]
@@ -0,0 +1,24 @@
+from collections.abc import Iterable, Iterator
+from itertools import batched
+from typing import Any
+
+from starlette.routing import Route
+
+from ._base import RadixerRoutingTable, lookup_many
+
+
+def lookup_stream(
+    routing_table: RadixerRoutingTable,
+    pairs: Iterable[tuple[str, str]],
+    *,
+    batch_size: int = 65536,
+    threads: int = 1,
+) -> Iterator[tuple[Route, dict[str, Any]] | None]:
+    # routes an unbounded stream of (method, path) pairs, e.g. an access log, in bounded batches
+    for batch in batched(pairs, batch_size):
+        yield from lookup_many(routing_table, batch, threads)
+
+
+__all__ = [
+    "lookup_stream",
+]
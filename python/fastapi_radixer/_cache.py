@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal, Protocol
+
+type CachePolicy = Literal["lru", "clock"]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LookupCache[K, V](Protocol):
+    stats: CacheStats
+
+    def get(self, key: K) -> V | None:
+        pass
+
+    def set(self, key: K, value: V) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    # a new empty cache with the same capacity and policy
+    def empty_copy(self) -> LookupCache[K, V]:
+        pass
+
+    def __len__(self) -> int:
+        pass
+
+
+def _check_capacity(capacity: int) -> int:
+    if capacity <= 0:
+        raise ValueError("cache capacity must be positive")
+
+    return capacity
+
+
+class LRUCache[K, V]:
+    __slots__ = ("capacity", "data", "stats")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = _check_capacity(capacity)
+        self.data: OrderedDict[K, V] = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, key: K) -> V | None:
+        # pop + insert instead of move_to_end, so concurrent eviction can't raise KeyError
+        value = self.data.pop(key, None)
+
+        if value is None:
+            self.stats.misses += 1
+            return None
+
+        self.data[key] = value
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self.data[key] = value
+
+        if len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def empty_copy(self) -> LRUCache[K, V]:
+        return LRUCache(self.capacity)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class ClockCache[K, V]:
+    __slots__ = ("capacity", "hand", "index", "keys", "referenced", "stats", "values")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = _check_capacity(capacity)
+        self.stats = CacheStats()
+
+        self.index: dict[K, int] = {}
+        self.keys: list[K | None] = [None] * capacity
+        self.values: list[V | None] = [None] * capacity
+        self.referenced = bytearray(capacity)
+        self.hand = 0
+
+    def get(self, key: K) -> V | None:
+        slot = self.index.get(key)
+
+        if slot is None:
+            self.stats.misses += 1
+            return None
+
+        self.referenced[slot] = 1
+        self.stats.hits += 1
+        return self.values[slot]
+
+    def set(self, key: K, value: V) -> None:
+        if (slot := self.index.get(key)) is not None:
+            self.values[slot] = value
+            self.referenced[slot] = 1
+            return
+
+        # give a second chance to every recently referenced entry under the hand
+        while self.referenced[self.hand]:
+            self.referenced[self.hand] = 0
+            self.hand = (self.hand + 1) % self.capacity
+
+        slot = self.hand
+        if (old := self.keys[slot]) is not None:
+            del self.index[old]
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.index[key] = slot
+        self.hand = (slot + 1) % self.capacity
+
+    def clear(self) -> None:
+        self.index.clear()
+        self.keys = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.referenced = bytearray(self.capacity)
+        self.hand = 0
+
+    def empty_copy(self) -> ClockCache[K, V]:
+        return ClockCache(self.capacity)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+def create_cache[K, V](capacity: int, policy: CachePolicy = "lru") -> LookupCache[K, V]:
+    match policy:
+        case "lru":
+            return LRUCache(capacity)
+        case "clock":
+            return ClockCache(capacity)
+        case _:
+            msg = f"Unknown cache policy: {policy}"
+            raise ValueError(msg)
+
+
+__all__ = [
+    "CachePolicy",
+    "CacheStats",
+    "ClockCache",
+    "LRUCache",
+    "LookupCache",
+    "create_cache",
+]
@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, cast
+
+from .parser import param_priority_key, scan_param_part
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from starlette.routing import BaseRoute, Route
+
+    from ._routing_table import RouteLeaf, RoutingTrie
+    from .types import Method, Methods, ParamType, Path
+
+_METHOD_BITS: dict[Method, int] = {
+    "GET": 1 << 0,
+    "POST": 1 << 1,
+    "PUT": 1 << 2,
+    "DELETE": 1 << 3,
+    "PATCH": 1 << 4,
+    "HEAD": 1 << 5,
+    "OPTIONS": 1 << 6,
+    "WEBSOCKET": 1 << 7,
+    "*": 1 << 8,
+}
+
+
+def method_mask(methods: Iterable[Method]) -> int:
+    mask = 0
+    for method in methods:
+        mask |= _METHOD_BITS.get(method, 0)
+
+    return mask
+
+
+ALL_METHODS = method_mask(_METHOD_BITS)
+SUPPORTED_METHODS: frozenset[Method] = frozenset(_METHOD_BITS)
+
+# stack edge marker of a tail capture, that consumes the rest of the path in one step
+_TAIL = -1
+
+# most nodes have no static children, patterns or leafs, they all share one empty table that is never mutated
+_EMPTY: dict[Any, Any] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTrie:
+    # all per-node arrays are indexed by node id, node 0 is the root
+    radix_edges: tuple[tuple[Path, int] | None, ...]
+    static_edges: tuple[dict[Path, int], ...]
+    param_edges: tuple[tuple[tuple[ParamType, int], ...], ...]
+    # params with a static prefix/suffix inside a segment, indexed by the prefix,
+    # tried after the static edge and before single segment params
+    pattern_edges: tuple[dict[Path, tuple[tuple[Path, ParamType, int], ...]], ...]
+    # distinct prefix sizes of pattern edges, longest first
+    pattern_prefix_sizes: tuple[tuple[int, ...], ...]
+    # "path" params, tried after static and single segment params
+    tail_edges: tuple[int | None, ...]
+    # method-indexed leaf tables and their bitmasks
+    leafs: tuple[dict[Method, int], ...]
+    leaf_methods: tuple[int, ...]
+    # methods of all routes in the subtree, used to prune branches
+    node_methods: tuple[int, ...]
+
+    # per-route arrays are indexed by route id
+    routes: tuple[Route, ...]
+    route_keys: tuple[tuple[str, ...], ...]
+    route_convertors: tuple[tuple[Callable[[str], Any], ...], ...]
+
+    # the deepest route params count, raw captured values are written into a list of this size
+    max_params: int
+
+    # raw values are converted only for the matched route, or handed over as strings when disabled
+    convert_params: bool
+
+    # literal first segments of all routes, a path starting with any other segment is a definite miss,
+    # None when the root has param edges
+    first_segments: frozenset[Path] | None
+
+    def dump_state(self, positions: dict[int, int]) -> tuple[Any, ...]:
+        # only builtin types, so it can be marshalled, routes are stored by their position in the router
+        # and convertors are taken from the live routes on load
+        return (
+            self.radix_edges,
+            self.static_edges,
+            self.param_edges,
+            self.pattern_edges,
+            self.pattern_prefix_sizes,
+            self.tail_edges,
+            self.leafs,
+            self.leaf_methods,
+            self.node_methods,
+            tuple(positions[id(route)] for route in self.routes),
+            self.route_keys,
+            self.max_params,
+            self.first_segments,
+        )
+
+    def lookup(self, method: Method, path: Path) -> tuple[Route, dict[str, Any]] | None:
+        if self.first_segments is not None and path.partition("/")[0] not in self.first_segments:
+            return None
+
+        args: list[Any] = [None] * self.max_params
+
+        if (node := self._walk(_METHOD_BITS.get(method, 0), path, args)) is None:
+            return None
+
+        route = self.leafs[node][method]
+        keys = self.route_keys[route]
+
+        if not self.convert_params:
+            return self.routes[route], dict(zip(keys, args, strict=False))
+
+        convertors = self.route_convertors[route]
+        return self.routes[route], {
+            key: convert(value) for key, convert, value in zip(keys, convertors, args, strict=False)
+        }
+
+    def lookup_raw(self, method: Method, path: Path) -> tuple[Route, dict[str, str]] | None:
+        if self.first_segments is not None and path.partition("/")[0] not in self.first_segments:
+            return None
+
+        args: list[Any] = [None] * self.max_params
+
+        if (node := self._walk(_METHOD_BITS.get(method, 0), path, args)) is None:
+            return None
+
+        route = self.leafs[node][method]
+        return self.routes[route], dict(zip(self.route_keys[route], args, strict=False))
+
+    def allowed_methods(self, path: Path) -> Methods:
+        if self.first_segments is not None and path.partition("/")[0] not in self.first_segments:
+            return set()
+
+        node = self._walk(ALL_METHODS, path, [None] * self.max_params)
+
+        return set() if node is None else set(self.leafs[node])
+
+    def _walk(self, mask: int, path: Path, args: list[Any]) -> int | None:
+        size = len(path)
+
+        radix_edges = self.radix_edges
+        static_edges = self.static_edges
+        param_edges = self.param_edges
+        pattern_edges = self.pattern_edges
+        tail_edges = self.tail_edges
+        leaf_methods = self.leaf_methods
+        node_methods = self.node_methods
+
+        # (node, position in path, next edge to try, number of captured args)
+        # position past the end of the path means that the whole path is consumed,
+        # edge 0 is the static/radix edge, edge i > 0 is the (i - 1)-th param edge and _TAIL is the tail edge
+        stack = [(0, 0 if path else size + 1, 0, 0)]
+
+        while stack:
+            node, pos, edge, nargs = stack.pop()
+
+            if edge == _TAIL:
+                args[nargs] = path[pos:]
+                node, pos, edge, nargs = cast(int, tail_edges[node]), size + 1, 0, nargs + 1
+
+            if not node_methods[node] & mask:
+                continue
+
+            if pos > size and leaf_methods[node] & mask:
+                return node
+
+            # tail has the lowest priority, so it's pushed first, an empty tail still matches
+            # like the ".*" regex of starlette path convertor
+            if not edge and tail_edges[node] is not None:
+                stack.append((node, pos, _TAIL, nargs))
+
+            if pos > size:
+                continue
+
+            if radix := radix_edges[node]:
+                self._radix_step(stack, radix, path, pos, nargs)
+                continue
+
+            end = path.find("/", pos)
+            segment = path[pos:] if end < 0 else path[pos:end]
+
+            if edge:
+                self._param_step(stack, args, segment, (node, pos, edge, nargs))
+            else:
+                has_params = bool(param_edges[node] or pattern_edges[node])
+                self._static_step(stack, static_edges[node], has_params, segment, (node, pos, edge, nargs))
+
+        return None
+
+    @staticmethod
+    def _radix_step(
+        stack: list[tuple[int, int, int, int]],
+        radix: tuple[Path, int],
+        path: Path,
+        pos: int,
+        nargs: int,
+    ) -> None:
+        label, child = radix
+        end = pos + len(label)
+
+        if path.startswith(label, pos) and (end == len(path) or path[end] == "/"):
+            stack.append((child, end + 1, 0, nargs))
+
+    @staticmethod
+    def _static_step(
+        stack: list[tuple[int, int, int, int]],
+        edges: dict[Path, int],
+        has_params: bool,  # noqa: FBT001
+        segment: Path,
+        state: tuple[int, int, int, int],
+    ) -> None:
+        node, pos, _, nargs = state
+
+        # static edge has the highest priority, so it's pushed last
+        if has_params:
+            stack.append((node, pos, 1, nargs))
+
+        if (child := edges.get(segment)) is not None:
+            stack.append((child, pos + len(segment) + 1, 0, nargs))
+
+    def _param_step(
+        self,
+        stack: list[tuple[int, int, int, int]],
+        args: list[Any],
+        segment: Path,
+        state: tuple[int, int, int, int],
+    ) -> None:
+        node, pos, edge, nargs = state
+        next_pos = pos + len(segment) + 1
+
+        # candidates are the same for the same node and segment, so edge indexes are stable between resumes
+        patterns = self._match_patterns(node, segment) if self.pattern_edges[node] else ()
+        params = self.param_edges[node]
+        total = len(patterns) + len(params)
+
+        for i in range(edge - 1, total):
+            if i < len(patterns):
+                param_type, child, value = patterns[i]
+            else:
+                param_type, child = params[i - len(patterns)]
+                value = segment
+
+            if not scan_param_part(param_type, value):
+                continue
+
+            # remember where to resume if the rest of the path does not match this branch
+            if i + 1 < total:
+                stack.append((node, pos, i + 2, nargs))
+
+            args[nargs] = value
+            stack.append((child, next_pos, 0, nargs + 1))
+            return
+
+    def _match_patterns(self, node: int, segment: Path) -> list[tuple[ParamType, int, str]]:
+        patterns = self.pattern_edges[node]
+        candidates = []
+
+        for size in self.pattern_prefix_sizes[node]:
+            # the captured value can't be empty
+            if size >= len(segment):
+                continue
+
+            for suffix, param_type, child in patterns.get(segment[:size], ()):
+                end = len(segment) - len(suffix)
+
+                if end > size and segment.endswith(suffix):
+                    candidates.append((param_type, child, segment[size:end]))
+
+        return candidates
+
+
+class _TrieCompiler:
+    def __init__(self) -> None:
+        self.radix_edges: list[tuple[Path, int] | None] = []
+        self.static_edges: list[dict[Path, int]] = []
+        self.param_edges: list[tuple[tuple[ParamType, int], ...]] = []
+        self.pattern_edges: list[dict[Path, tuple[tuple[Path, ParamType, int], ...]]] = []
+        self.tail_edges: list[int | None] = []
+        self.leafs: list[dict[Method, int]] = []
+        self.node_methods: list[int] = []
+
+        self.routes: list[RouteLeaf] = []
+        self.route_ids: dict[int, int] = {}
+
+    def add_route(self, route: RouteLeaf) -> int:
+        key = id(route)
+
+        if key not in self.route_ids:
+            self.route_ids[key] = len(self.routes)
+            self.routes.append(route)
+
+        return self.route_ids[key]
+
+    def add_leafs(self, leafs: tuple[RouteLeaf, ...]) -> dict[Method, int]:
+        if not leafs:
+            return _EMPTY
+
+        table: dict[Method, int] = {}
+
+        # first registered route wins, same as in starlette
+        for leaf in leafs:
+            route = self.add_route(leaf)
+
+            for method in leaf.methods:
+                table.setdefault(method, route)
+
+        return table
+
+    def add_node(self, trie: RoutingTrie) -> int:
+        node = len(self.node_methods)
+
+        self.radix_edges.append(None)
+        self.static_edges.append(_EMPTY)
+        self.param_edges.append(())
+        self.pattern_edges.append(_EMPTY)
+        self.tail_edges.append(None)
+        self.leafs.append(self.add_leafs(trie.leafs))
+        self.node_methods.append(method_mask(trie.methods))
+
+        if self.is_chain(trie):
+            ((label, child),) = trie.static_parts.items()
+            labels = [label]
+
+            # collapse single-child chains into one radix edge
+            while self.is_chain(child):
+                ((label, child),) = child.static_parts.items()
+                labels.append(label)
+
+            self.radix_edges[node] = sys.intern("/".join(labels)), self.add_node(child)
+            return node
+
+        self.static_edges[node] = {
+            sys.intern(label): self.add_node(child) for label, child in trie.static_parts.items()
+        } or _EMPTY
+        self.param_edges[node] = tuple(
+            (param_type, self.add_node(trie.param_parts[param_type]))
+            for param_type in sorted(trie.param_parts, key=param_priority_key)
+            if param_type != "path"
+        )
+
+        if tail := trie.param_parts.get("path"):
+            self.tail_edges[node] = self.add_node(tail)
+
+        self.add_patterns(node, trie)
+        return node
+
+    def add_patterns(self, node: int, trie: RoutingTrie) -> None:
+        patterns: dict[Path, list[tuple[Path, ParamType, int]]] = {}
+
+        # inside a prefix, longer suffixes are more specific, then params priority applies
+        for prefix, suffix, param_type in sorted(
+            trie.pattern_parts,
+            key=lambda key: (-len(key[1]), param_priority_key(key[2])),
+        ):
+            child = self.add_node(trie.pattern_parts[prefix, suffix, param_type])
+            patterns.setdefault(sys.intern(prefix), []).append((sys.intern(suffix), param_type, child))
+
+        self.pattern_edges[node] = {prefix: tuple(edges) for prefix, edges in patterns.items()} or _EMPTY
+
+    @staticmethod
+    def is_chain(trie: RoutingTrie) -> bool:
+        return not trie.param_parts and not trie.pattern_parts and not trie.leafs and len(trie.static_parts) == 1
+
+    def first_segments(self) -> frozenset[Path] | None:
+        if self.param_edges[0] or self.pattern_edges[0] or self.tail_edges[0] is not None:
+            return None
+
+        if radix := self.radix_edges[0]:
+            label, _ = radix
+            return frozenset({label.partition("/")[0]})
+
+        return frozenset(self.static_edges[0])
+
+    def compile(self, trie: RoutingTrie, *, convert_params: bool) -> CompiledTrie:
+        self.add_node(trie)
+
+        return CompiledTrie(
+            radix_edges=tuple(self.radix_edges),
+            static_edges=tuple(self.static_edges),
+            param_edges=tuple(self.param_edges),
+            pattern_edges=tuple(self.pattern_edges),
+            pattern_prefix_sizes=tuple(
+                tuple(sorted({len(prefix) for prefix in patterns}, reverse=True)) for patterns in self.pattern_edges
+            ),
+            tail_edges=tuple(self.tail_edges),
+            leafs=tuple(self.leafs),
+            leaf_methods=tuple(method_mask(leafs) for leafs in self.leafs),
+            node_methods=tuple(self.node_methods),
+            routes=tuple(route.route for route in self.routes),
+            route_keys=tuple(route.params for route in self.routes),
+            route_convertors=tuple(
+                tuple(route.route.param_convertors[key].convert for key in route.params) for route in self.routes
+            ),
+            max_params=max((len(route.params) for route in self.routes), default=0),
+            convert_params=convert_params,
+            first_segments=self.first_segments(),
+        )
+
+
+def load_compiled_trie(state: tuple[Any, ...], routes: list[BaseRoute], *, convert_params: bool) -> CompiledTrie:
+    (
+        radix_edges,
+        static_edges,
+        param_edges,
+        pattern_edges,
+        pattern_prefix_sizes,
+        tail_edges,
+        leafs,
+        leaf_methods,
+        node_methods,
+        positions,
+        route_keys,
+        max_params,
+        first_segments,
+    ) = state
+    compiled_routes = tuple(cast("Route", routes[position]) for position in positions)
+
+    return CompiledTrie(
+        radix_edges=radix_edges,
+        static_edges=static_edges,
+        param_edges=param_edges,
+        pattern_edges=pattern_edges,
+        pattern_prefix_sizes=pattern_prefix_sizes,
+        tail_edges=tail_edges,
+        leafs=leafs,
+        leaf_methods=leaf_methods,
+        node_methods=node_methods,
+        routes=compiled_routes,
+        route_keys=route_keys,
+        route_convertors=tuple(
+            tuple(route.param_convertors[key].convert for key in keys)
+            for route, keys in zip(compiled_routes, route_keys, strict=True)
+        ),
+        max_params=max_params,
+        convert_params=convert_params,
+        first_segments=first_segments,
+    )
+
+
+def compile_trie(trie: RoutingTrie, *, convert_params: bool = True) -> CompiledTrie:
+    return _TrieCompiler().compile(trie, convert_params=convert_params)
+
+
+__all__ = [
+    "ALL_METHODS",
+    "SUPPORTED_METHODS",
+    "CompiledTrie",
+    "compile_trie",
+    "load_compiled_trie",
+    "method_mask",
+]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from starlette.routing import BaseRoute, Match, Mount, Route, WebSocketRoute
+
+from .parser import prepare_path
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from starlette.types import Scope
+
+    from .types import Path
+
+
+def _literal_prefix(route: BaseRoute) -> Path | None:
+    if not isinstance(route, (Route, WebSocketRoute, Mount)):
+        return None
+
+    prefix, _, _ = prepare_path(route.path_format).partition("/")
+    return None if "{" in prefix else prefix
+
+
+@dataclass
+class FallbackRouter:
+    # routes that are not indexed by the routing table, in registration order
+    routes: list[BaseRoute] = field(default_factory=list)
+
+    # route indexes by the literal first segment of the route path
+    prefix_routes: dict[Path, list[int]] = field(default_factory=dict)
+    # indexes of routes that can match any first segment, e.g. "/{name}.{ext}" or hosts
+    any_routes: list[int] = field(default_factory=list)
+
+    def add_route(self, route: BaseRoute) -> None:
+        index = len(self.routes)
+        self.routes.append(route)
+
+        if (prefix := _literal_prefix(route)) is None:
+            self.any_routes.append(index)
+        else:
+            self.prefix_routes.setdefault(prefix, []).append(index)
+
+    def candidates(self, path: Path) -> Iterable[BaseRoute]:
+        prefix, _, _ = path.partition("/")
+        indexes: Iterable[int] = self.prefix_routes.get(prefix, ())
+
+        # both lists are sorted, merging them keeps the registration order, same as in starlette
+        if self.any_routes:
+            indexes = heapq.merge(indexes, self.any_routes) if indexes else self.any_routes
+
+        return [self.routes[index] for index in indexes]
+
+    def match(self, scope: Scope, path: Path) -> tuple[BaseRoute, Scope] | None:
+        partial = None
+
+        for route in self.candidates(path):
+            match, child_scope = route.matches(scope)
+
+            if match == Match.FULL:
+                return route, child_scope
+
+            if match == Match.PARTIAL and partial is None:
+                partial = route, child_scope
+
+        return partial
+
+    def full_match(self, scope: Scope, path: Path) -> tuple[BaseRoute, Scope] | None:
+        for route in self.candidates(path):
+            match, child_scope = route.matches(scope)
+
+            if match == Match.FULL:
+                return route, child_scope
+
+        return None
+
+    def matches_any(self, scope: Scope, path: Path) -> bool:
+        return any(route.matches(scope)[0] != Match.NONE for route in self.candidates(path))
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+
+__all__ = [
+    "FallbackRouter",
+]
@@ -0,0 +1,22 @@
+from collections.abc import Iterable
+from typing import Any
+
+from starlette.routing import Route
+
+from .types import Methods, RouteDecl
+
+class RoutingTable:
+    convert_params: bool
+    release_gil: bool
+
+    def __init__(self, *, convert_params: bool = True, release_gil: bool = False) -> None: ...
+    def add_route(self, route: RouteDecl) -> None: ...
+    def prepare(self) -> None: ...
+    def empty_copy(self) -> RoutingTable: ...
+    def lookup(self, method: str, path: str) -> tuple[Route, dict[str, Any]] | None: ...
+    def lookup_many(
+        self,
+        pairs: Iterable[tuple[str, str]],
+        threads: int = 1,
+    ) -> list[tuple[Route, dict[str, str]] | None]: ...
+    def allowed_methods(self, path: str) -> Methods: ...
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from starlette.routing import Host
+
+from .parser import convertor_to_param_type, scan_param_part
+
+if TYPE_CHECKING:
+    from .types import ParamType
+
+# param types whose values can't contain a dot, so they always match exactly one label
+_LABEL_PARAM_TYPES: frozenset[ParamType] = frozenset({"int", "uuid"})
+
+
+def _first(*hosts: tuple[int, Host] | None) -> tuple[int, Host] | None:
+    # the first registered host wins, same as in starlette
+    return min((host for host in hosts if host is not None), default=None, key=lambda host: host[0])
+
+
+@dataclass
+class HostTrie:
+    # the first registered host of this node and its position in the router
+    route: tuple[int, Host] | None = None
+
+    static_labels: dict[str, HostTrie] = field(default_factory=dict)
+    param_labels: dict[ParamType, HostTrie] = field(default_factory=dict)
+
+    def add_host(self, route: tuple[int, Host], labels: list[tuple[str, bool]]) -> None:
+        node = self
+
+        for label, is_param in labels:
+            parts: dict[str, HostTrie] = node.param_labels if is_param else node.static_labels
+
+            if label not in parts:
+                parts[label] = HostTrie()
+
+            node = parts[label]
+
+        node.route = _first(node.route, route)
+
+    def lookup(self, labels: list[str], pos: int = 0) -> tuple[int, Host] | None:
+        if pos == len(labels):
+            return self.route
+
+        label = labels[pos]
+        found = None
+
+        # all matching branches are walked, as the first registered host wins, not the most specific one
+        if child := self.static_labels.get(label):
+            found = child.lookup(labels, pos + 1)
+
+        for param_type, child in self.param_labels.items():
+            if scan_param_part(param_type, label):
+                found = _first(found, child.lookup(labels, pos + 1))
+
+        return found
+
+
+@dataclass
+class HostTable:
+    # hosts without params, e.g. "api.example.com"
+    exact_hosts: dict[str, tuple[int, Host]] = field(default_factory=dict)
+    # hosts with params, e.g. "{tenant}.example.com", labels are stored from the top-level domain
+    host_trie: HostTrie = field(default_factory=HostTrie)
+    # hosts with params that can match several labels, e.g. "{tenant}" matches "a.b", by their labels count,
+    # they are matched by the host regex against hosts with more labels than the pattern
+    spanning_hosts: list[tuple[int, int, Host]] = field(default_factory=list)
+    size: int = 0
+
+    def add_host(self, route: Host, position: int) -> bool:
+        labels = _parse_host(route)
+
+        if labels is None:
+            return False
+
+        if all(not is_param for _, is_param in labels):
+            self.exact_hosts.setdefault(route.host, (position, route))
+        else:
+            self.host_trie.add_host((position, route), labels)
+
+        if any(is_param and label not in _LABEL_PARAM_TYPES for label, is_param in labels):
+            self.spanning_hosts.append((position, len(labels), route))
+
+        self.size += 1
+        return True
+
+    def lookup(self, host: str) -> Host | None:
+        labels = host.split(".")[::-1]
+        found = _first(self.exact_hosts.get(host), self.host_trie.lookup(labels))
+
+        for position, size, route in self.spanning_hosts:
+            # the trie already matched hosts with the same labels count, each param there is a single label
+            if found is not None and position > found[0]:
+                break
+
+            if size < len(labels) and route.host_regex.match(host):
+                found = position, route
+                break
+
+        return None if found is None else found[1]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def _parse_host(route: Host) -> list[tuple[str, bool]] | None:
+    labels = []
+
+    # the port is stripped from the host header before matching
+    if ":" in route.host.rsplit("}", 1)[-1]:
+        return None
+
+    for label in reversed(route.host.split(".")):
+        if "{" not in label:
+            labels.append((label, False))
+            continue
+
+        # params are indexed only as whole labels, the ones that can span several labels are checked by the regex
+        if not (label.startswith("{") and label.endswith("}")):
+            return None
+
+        param_type = convertor_to_param_type(route.param_convertors[label[1:-1].split(":")[0]])
+
+        if param_type is None or param_type == "path":
+            return None
+
+        labels.append((param_type, True))
+
+    return labels
+
+
+__all__ = [
+    "HostTable",
+    "HostTrie",
+]
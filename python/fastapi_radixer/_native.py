@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ._routing_table import RoutingTable
+
+if TYPE_CHECKING:
+    from ._base import RadixerRoutingTable
+    from ._fastapi_radixer import RoutingTable as _NativeRoutingTable
+
+# None when the extension is not built
+NativeRoutingTable: type[_NativeRoutingTable] | None
+
+try:
+    from . import _fastapi_radixer
+except ImportError:  # pragma: no cover
+    NativeRoutingTable = None
+else:
+    NativeRoutingTable = _fastapi_radixer.RoutingTable
+
+
+def has_native() -> bool:
+    return NativeRoutingTable is not None
+
+
+def default_routing_table() -> RadixerRoutingTable:
+    # the native table is opt-in until the test suite runs against it in CI
+    return RoutingTable()
+
+
+__all__ = [
+    "NativeRoutingTable",
+    "default_routing_table",
+    "has_native",
+]
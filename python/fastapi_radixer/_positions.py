@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from starlette.routing import BaseRoute
+
+
+@dataclass
+class RoutePositions:
+    # positions of routes in the router, recorded up to the last host or mount, a route registered before
+    # the matched host or mount wins, same as in starlette
+    positions: dict[int, int] = field(default_factory=dict)
+    recorded: int = 0
+
+    def add_route(self, route: BaseRoute, position: int, routes: Sequence[BaseRoute] = ()) -> None:
+        for i in range(self.recorded, min(position, len(routes))):
+            self.positions.setdefault(id(routes[i]), i)
+
+        self.positions[id(route)] = position
+        self.recorded = max(self.recorded, position + 1)
+
+    def precedes(self, route: BaseRoute, other: BaseRoute) -> bool:
+        return self.positions.get(id(route), math.inf) < self.positions[id(other)]
+
+
+__all__ = [
+    "RoutePositions",
+]
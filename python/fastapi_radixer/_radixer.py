@@ -1,32 +1,187 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from os import PathLike
 from typing import TYPE_CHECKING, Any, cast
 
 from fastapi import APIRouter, FastAPI
 from starlette._utils import get_route_path
-from starlette.routing import BaseRoute, Route
+from starlette.datastructures import URL, Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse, RedirectResponse
+from starlette.routing import BaseRoute, Host, Match, Mount, Route, Router
 from starlette.types import Receive, Scope, Send
 
-from ._base import RadixerRoutingTable
+from ._base import RadixerRoutingTable, allowed_methods, table_factory
+from ._fallback import FallbackRouter
+from ._hosts import HostTable
+from ._native import default_routing_table
+from ._positions import RoutePositions
 from ._routing_table import RoutingTable
-from .parser import parse_route, prepare_path
-from .types import Method
+from ._snapshot import Snapshot, decode_snapshot, encode_snapshot, read_snapshot_file, write_snapshot_file
+from .parser import HTTP_METHODS, parse_route, prepare_path, unindexed_reason
+from .types import Method, Methods, Path
 
+logger = logging.getLogger("fastapi_radixer")
 
-class Radixer(APIRouter):
+
+@dataclass(frozen=True)
+class RebuildInfo:
+    routes: int
+    indexed: int
+    fallback: int
+    duration: float
+
+
+@dataclass(frozen=True)
+class CoverageReport:
+    indexed: list[BaseRoute]
+    # not indexed routes with the reason, they are matched by the regular starlette router
+    fallback: list[tuple[BaseRoute, str]]
+
+    def format(self) -> str:
+        lines = [f"{len(self.indexed)} routes indexed, {len(self.fallback)} routes fall back"]
+        lines.extend(f"  {route!r}: {reason}" for route, reason in self.fallback)
+
+        return "\n".join(lines)
+
+
+def _coverage_report(routes: list[BaseRoute], fallback_routes: list[BaseRoute]) -> CoverageReport:
+    fallback = {id(route) for route in fallback_routes}
+
+    return CoverageReport(
+        indexed=[route for route in routes if id(route) not in fallback],
+        fallback=[(route, _fallback_reason(route)) for route in fallback_routes],
+    )
+
+
+def _fallback_reason(route: BaseRoute) -> str:
+    if isinstance(route, Host):
+        return "host pattern has partial labels, a port or path params"
+
+    return unindexed_reason(route) or "not indexed"
+
+
+@dataclass(frozen=True, slots=True)
+class RouterState:
     routing_table: RadixerRoutingTable
+    host_table: HostTable
+    # not indexed routes, matched on a routing table miss
+    fallback_router: FallbackRouter
+    # positions of routes up to the last host or mount, to keep the starlette order with routes registered before them
+    positions: RoutePositions
+    # bound to the prepared routing table lookup after the first prepare() call
+    lookup: Callable[[Method, Path], tuple[Route, dict[str, Any]] | None]
+
+
+def _redirect_scope(scope: Scope) -> Scope:
+    # same as in starlette, the trailing slash of the path is toggled
+    path: str = scope["path"]
+    return {**scope, "path": path.rstrip("/") if path.endswith("/") else f"{path}/"}
+
+
+def _index_routes(
+    state: RouterState,
+    routes: list[BaseRoute],
+    routing_table_factory: Callable[[], RadixerRoutingTable],
+) -> None:
+    for position, route in enumerate(routes):
+        _index_route(state, route, position, routes, routing_table_factory)
+
+
+def _index_route(
+    state: RouterState,
+    route: BaseRoute,
+    position: int,
+    routes: list[BaseRoute],
+    routing_table_factory: Callable[[], RadixerRoutingTable],
+) -> None:
+    if isinstance(route, (Mount, Host)):
+        _index_mounted_app(route, routing_table_factory)
+        # hosts match any path and mounts any path under them, routes registered before them must still win
+        state.positions.add_route(route, position, routes)
+
+    if isinstance(route, Host) and state.host_table.add_host(route, position):
+        return
+
+    if decl := parse_route(route):
+        state.routing_table.add_route(decl)
+    else:
+        state.fallback_router.add_route(route)
+
+
+def _index_mounted_app(mount: Mount | Host, routing_table_factory: Callable[[], RadixerRoutingTable]) -> None:
+    # mounted routers and sub applications get their own radixer, so the hand off is not a linear scan either,
+    # routers wrapped into middlewares and custom router classes are left as is
+    match mount.app:
+        case FastAPI(router=router) if type(router) is APIRouter:
+            init_app(mount.app, Radixer(routing_table_factory=routing_table_factory))
+        case Router() as router if type(router) in {Router, APIRouter}:
+            mount.app = _adopt_router(Radixer(routing_table_factory=routing_table_factory), router)
+        case _:
+            pass
+
+
+class Radixer(APIRouter):
+    # routing tables are published together with a single assignment, so a request never mixes
+    # tables of different rebuilds
+    state: RouterState
+    routing_table_factory: Callable[[], RadixerRoutingTable]
     fallback: bool
+    # refuse to start if any route is not indexed
+    strict: bool
 
-    if not TYPE_CHECKING:
+    # called after each copy-on-write rebuild of the routing table
+    on_rebuild: Callable[[RebuildInfo], None] | None
+
+    # routes snapshot file, when set routes are indexed on prepare() from the snapshot,
+    # or from scratch with the snapshot written for the next workers
+    snapshot: str | PathLike[str] | None
+    deferred: bool
+    # number of indexed routes of self.routes, routes appended to the list directly are indexed on the next request
+    indexed_routes: int
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *args: Any,
+        routing_table: RadixerRoutingTable | None = None,
+        routing_table_factory: Callable[[], RadixerRoutingTable] | None = None,
+        fallback: bool = True,
+        strict: bool = False,
+        on_rebuild: Callable[[RebuildInfo], None] | None = None,
+        snapshot: str | PathLike[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+
+        # rebuilt and mounted tables keep the settings of the given one, e.g. caches and raw params
+        if routing_table_factory is None:
+            routing_table_factory = table_factory(routing_table) if routing_table else default_routing_table
+
+        self.routing_table_factory = routing_table_factory
+        self.fallback = fallback
+        self.strict = strict
+        self.on_rebuild = on_rebuild
+        self.snapshot = snapshot
+        self.deferred = snapshot is not None
+        self.indexed_routes = 0
+        self._update_lock = threading.RLock()
+        self.state = RouterState(
+            routing_table=routing_table or routing_table_factory(),
+            host_table=HostTable(),
+            fallback_router=FallbackRouter(),
+            positions=RoutePositions(),
+            lookup=self._prepare_and_lookup,
+        )
+        self.add_routes(self.routes)
+        self.wrap_lifespan()
 
-        def __init__(
-            self,
-            *args: Any,
-            routing_table: RadixerRoutingTable | None = None,
-            fallback: bool = True,
-            **kwargs: Any,
-        ) -> None:
-            super().__init__(*args, **kwargs)
-            self.routing_table = routing_table or RoutingTable()
-            self.fallback = fallback
+    # the overrides only index the appended route, type checkers keep the signatures of APIRouter
+    if not TYPE_CHECKING:
 
         def add_api_route(self, *args: Any, **kwargs: Any) -> None:
             super().add_api_route(*args, **kwargs)
@@ -36,41 +191,305 @@ class Radixer(APIRouter):
             super().add_route(*args, **kwargs)
             self.try_add_route(self.routes[-1])
 
+        def add_api_websocket_route(self, *args: Any, **kwargs: Any) -> None:
+            super().add_api_websocket_route(*args, **kwargs)
+            self.try_add_route(self.routes[-1])
+
+        def add_websocket_route(self, *args: Any, **kwargs: Any) -> None:
+            super().add_websocket_route(*args, **kwargs)
+            self.try_add_route(self.routes[-1])
+
+        def mount(self, *args: Any, **kwargs: Any) -> None:
+            super().mount(*args, **kwargs)
+            self.try_add_route(self.routes[-1])
+
+        def host(self, *args: Any, **kwargs: Any) -> None:
+            super().host(*args, **kwargs)
+            self.try_add_route(self.routes[-1])
+
+    @property
+    def routing_table(self) -> RadixerRoutingTable:
+        return self.state.routing_table
+
+    @property
+    def host_table(self) -> HostTable:
+        return self.state.host_table
+
+    @property
+    def fallback_router(self) -> FallbackRouter:
+        return self.state.fallback_router
+
+    @property
+    def fallback_routes(self) -> list[BaseRoute]:
+        return self.state.fallback_router.routes
+
+    def lookup(self, method: Method, path: Path) -> tuple[Route, dict[str, Any]] | None:
+        return self.state.lookup(method, path)
+
+    def prepare(self) -> None:
+        with self._update_lock:
+            if self.deferred:
+                self.index_snapshot()
+
+            state = self.state
+            self.check_coverage(self.routes, state.fallback_router.routes)
+            state.routing_table.prepare()
+            self.state = replace(state, lookup=state.routing_table.lookup)
+
+    def coverage_report(self) -> CoverageReport:
+        return _coverage_report(self.routes, self.fallback_routes)
+
+    def index_snapshot(self) -> None:
+        self.deferred = False
+        path = cast("str | PathLike[str]", self.snapshot)
+
+        if (snapshot := read_snapshot_file(path, self.routes, self.snapshot_options())) is not None:
+            self.state = self.apply_snapshot(snapshot, self.routing_table)
+            self.indexed_routes = len(self.routes)
+            return
+
+        self.add_routes(self.routes)
+
+        try:
+            write_snapshot_file(path, self.dump_snapshot())
+        except OSError:
+            logger.warning("Can't write routes snapshot to %s", path, exc_info=True)
+
+    def dump_snapshot(self) -> bytes:
+        if self.deferred:
+            self.prepare()
+
+        fallback = {id(route) for route in self.fallback_routes}
+        decls = [decl for route in self.routes if id(route) not in fallback and (decl := parse_route(route))]
+        table_state = None
+
+        # the python table state is its compiled trie, other engines are rebuilt from the parsed routes
+        if isinstance(self.routing_table, RoutingTable):
+            table_state = self.routing_table.dump_state(self.routes)
+
+        return encode_snapshot(self.routes, decls, self.fallback_routes, table_state, self.snapshot_options())
+
+    def snapshot_options(self) -> tuple[Any, ...]:
+        # a snapshot written with other table options is stale, both engines load snapshots of each other
+        return (("convert_params", getattr(self.routing_table, "convert_params", True)),)
+
+    def load_snapshot(self, data: bytes) -> bool:
+        # a snapshot of other routes is ignored, the current tables are kept then
+        if (snapshot := decode_snapshot(data, self.routes, self.snapshot_options())) is None:
+            return False
+
+        with self._update_lock:
+            self.deferred = False
+            state = self.apply_snapshot(snapshot, self.routing_table_factory())
+            state.routing_table.prepare()
+            self.indexed_routes = len(self.routes)
+            self.state = replace(state, lookup=state.routing_table.lookup)
+
+        return True
+
+    def apply_snapshot(self, snapshot: Snapshot, routing_table: RadixerRoutingTable) -> RouterState:
+        host_table = HostTable()
+        fallback_router = FallbackRouter()
+
+        for route in self.routes:
+            if isinstance(route, (Mount, Host)):
+                _index_mounted_app(route, self.routing_table_factory)
+
+        # all routes are known at once, so all positions are recorded
+        positions = RoutePositions(
+            positions={id(route): position for position, route in enumerate(self.routes)},
+            recorded=len(self.routes),
+        )
+
+        for host in snapshot.hosts:
+            host_table.add_host(host, positions.positions[id(host)])
+
+        for route in snapshot.fallback:
+            fallback_router.add_route(route)
+
+        if isinstance(routing_table, RoutingTable) and snapshot.table_state is not None:
+            routing_table.restore(snapshot)
+        else:
+            for decl in snapshot.decls():
+                routing_table.add_route(decl)
+
+        return RouterState(
+            routing_table=routing_table,
+            host_table=host_table,
+            fallback_router=fallback_router,
+            positions=positions,
+            lookup=self._prepare_and_lookup,
+        )
+
+    def check_coverage(self, routes: list[BaseRoute], fallback_routes: list[BaseRoute]) -> None:
+        if not fallback_routes:
+            return
+
+        report = _coverage_report(routes, fallback_routes)
+
+        if self.strict:
+            msg = f"Radixer strict mode, not indexed routes found:\n{report.format()}"
+            raise RuntimeError(msg)
+
+        logger.info("%s", report.format())
+
+    def _prepare_and_lookup(self, method: Method, path: Path) -> tuple[Route, dict[str, Any]] | None:
+        # routes were not compiled on startup (no lifespan), do it once on the first request
+        self.prepare()
+        return self.state.lookup(method, path)
+
+    def wrap_lifespan(self) -> None:
+        lifespan_context = self.lifespan_context
+
+        @asynccontextmanager
+        async def _lifespan(app: Any) -> AsyncIterator[Any]:
+            self.prepare()
+
+            async with lifespan_context(app) as state:
+                yield state
+
+        self.lifespan_context = _lifespan
+
     def try_add_route(self, route: BaseRoute) -> None:
-        if not isinstance(route, Route):
+        # with a snapshot, all routes are indexed at once on prepare()
+        if self.deferred:
             return
 
-        if decl := parse_route(route):
-            self.routing_table.add_route(decl)
+        # routes are indexed right after they are appended to the router
+        routes = self.routes
+        position = len(routes) - 1 if routes and routes[-1] is route else len(routes)
+
+        _index_route(self.state, route, position, routes, self.routing_table_factory)
+        self.indexed_routes = max(self.indexed_routes, position + 1)
+
+    def index_appended_routes(self) -> None:
+        with self._update_lock:
+            routes = self.routes
+
+            for position in range(self.indexed_routes, len(routes)):
+                _index_route(self.state, routes[position], position, routes, self.routing_table_factory)
+
+            self.indexed_routes = max(self.indexed_routes, len(routes))
+
+    def update_routes(
+        self,
+        *,
+        add: Iterable[BaseRoute] = (),
+        remove: Iterable[BaseRoute] = (),
+        replace: Iterable[tuple[BaseRoute, BaseRoute]] = (),
+    ) -> RebuildInfo:
+        # builds new tables aside and publishes them with a single swap of the state reference,
+        # so in-flight requests keep using the old tables and the request path takes no locks
+        with self._update_lock:
+            start = time.perf_counter()
+
+            removed = {id(route) for route in remove}
+            replaced = {id(old): new for old, new in replace}
+
+            routes = [replaced.get(id(route), route) for route in self.routes if id(route) not in removed]
+            routes.extend(add)
+
+            routing_table = self.routing_table_factory()
+            state = RouterState(
+                routing_table=routing_table,
+                host_table=HostTable(),
+                fallback_router=FallbackRouter(),
+                positions=RoutePositions(),
+                lookup=routing_table.lookup,
+            )
+            _index_routes(state, routes, self.routing_table_factory)
+            self.check_coverage(routes, state.fallback_router.routes)
+            routing_table.prepare()
+
+            self.deferred = False
+            self.indexed_routes = len(routes)
+            self.routes = routes
+            self.state = state
+
+            info = RebuildInfo(
+                routes=len(routes),
+                indexed=len(routes) - len(state.fallback_router),
+                fallback=len(state.fallback_router),
+                duration=time.perf_counter() - start,
+            )
+
+        if self.on_rebuild:
+            self.on_rebuild(info)
+
+        return info
+
+    async def update_routes_async(
+        self,
+        *,
+        add: Iterable[BaseRoute] = (),
+        remove: Iterable[BaseRoute] = (),
+        replace: Iterable[tuple[BaseRoute, BaseRoute]] = (),
+    ) -> RebuildInfo:
+        return await asyncio.to_thread(
+            self.update_routes,
+            add=[*add],
+            remove=[*remove],
+            replace=[*replace],
+        )
 
     def add_routes(self, routes: list[BaseRoute]) -> None:
-        for route in routes:
-            self.try_add_route(route)
+        # with a snapshot, all routes are indexed at once on prepare()
+        if not self.deferred:
+            _index_routes(self.state, routes, self.routing_table_factory)
+            self.indexed_routes = len(routes)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if scope["type"] != "http":
+        if scope["type"] not in {"http", "websocket"}:
             await super().__call__(scope, receive, send)
             return
 
-        self.routing_table.prepare()
-
         scope.setdefault("router", self)
 
+        # a deferred snapshot also fills the host table, so it can't wait for the first lookup
+        if self.deferred:
+            self.prepare()
+
+        # routes appended to the list directly, e.g. router.routes.append(route), are indexed before routing
+        if len(self.routes) > self.indexed_routes:
+            self.index_appended_routes()
+
+        # read once, so the whole request is routed by tables of the same rebuild
+        state = self.state
+
         path = prepare_path(get_route_path(scope))
-        method = cast(Method, scope["method"])
+        method: Method = "WEBSOCKET"
 
-        res = self.routing_table.lookup(method, path)
+        if scope["type"] == "http":
+            # other methods are only indexed for mounts, routes with them are matched by the fallback router
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "*"
 
-        if res is None:
-            if not self.fallback:
-                await self.not_found(scope, receive, send)
-                return
+        res = state.lookup(method, path)
 
-            await super().__call__(scope, receive, send)
+        # host routes match any path, so a matched host wins unless the path route was registered before it
+        if state.host_table and (host := self.match_host(scope, path, res, state)):
+            await self.handle_host(scope, receive, send, host)
+            return
+
+        if res is None:
+            await self.handle_miss(scope, receive, send, path, state)
             return
 
         route, params = res
 
+        if isinstance(route, Mount):
+            # a mount matches any path under it, not indexed routes registered before it are matched first
+            if (
+                self.fallback
+                and (fallback := state.fallback_router.full_match(scope, path))
+                and state.positions.precedes(fallback[0], route)
+            ):
+                scope.update(fallback[1])
+                await fallback[0].handle(scope, receive, send)
+                return
+
+            await self.handle_mount(scope, receive, send, route, state)
+            return
+
         scope.update(
             {
                 "route": route,
@@ -83,24 +502,151 @@ class Radixer(APIRouter):
 
         return
 
+    def match_host(
+        self,
+        scope: Scope,
+        path: str,
+        res: tuple[Route, dict[str, Any]] | None,
+        state: RouterState,
+    ) -> Host | None:
+        # the port is not a part of the host pattern, same as in starlette
+        host = Headers(scope=scope).get("host", "").split(":")[0]
+
+        if (route := state.host_table.lookup(host)) is None:
+            return None
+
+        # starlette takes the first fully matching route, so path routes registered before the host win
+        if res is not None:
+            return None if state.positions.precedes(res[0], route) else route
+
+        if self.fallback and (fallback := state.fallback_router.full_match(scope, path)):
+            return None if state.positions.precedes(fallback[0], route) else route
+
+        return route
+
+    async def handle_host(self, scope: Scope, receive: Receive, send: Send, route: Host) -> None:
+        # the host regex builds the child scope with converted host params merged into path_params
+        _, child_scope = route.matches(scope)
+
+        scope.update(child_scope)
+        await route.handle(scope, receive, send)
+
+    async def handle_mount(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        mount: Mount,
+        state: RouterState,
+    ) -> None:
+        # the mount regex is checked once more to build the child scope exactly like starlette does,
+        # it only differs from the indexed tail for the mount path without a trailing slash
+        match, child_scope = mount.matches(scope)
+
+        if match == Match.FULL:
+            scope.update(child_scope)
+            await mount.handle(scope, receive, send)
+            return
+
+        if await self.handle_fallback(scope, receive, send, prepare_path(get_route_path(scope)), state):
+            return
+
+        # starlette redirects "/mount" to "/mount/"
+        if scope["type"] == "http" and self.redirect_slashes:
+            await RedirectResponse(url=str(URL(scope=_redirect_scope(scope))))(scope, receive, send)
+            return
+
+        await self.default(scope, receive, send)
+
+    async def handle_miss(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        path: str,
+        state: RouterState,
+    ) -> None:
+        if await self.handle_fallback(scope, receive, send, path, state):
+            return
+
+        if scope["type"] == "http" and (allowed := allowed_methods(state.routing_table, path) - {"WEBSOCKET", "*"}):
+            await self.method_not_allowed(scope, receive, send, allowed)
+            return
+
+        await self.handle_not_found(scope, receive, send, path, state)
+
+    async def handle_fallback(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        path: str,
+        state: RouterState,
+    ) -> bool:
+        # only not indexed routes are matched, starting with a full match, then a partial one, like in starlette
+        if not self.fallback or not (res := state.fallback_router.match(scope, path)):
+            return False
+
+        route, child_scope = res
+        scope.update(child_scope)
+        await route.handle(scope, receive, send)
+        return True
+
+    async def handle_not_found(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        path: str,
+        state: RouterState,
+    ) -> None:
+        # same as in starlette, a path that matches with the trailing slash toggled is redirected,
+        # indexed routes ignore trailing slashes, so only not indexed ones are checked
+        if (
+            self.fallback
+            and self.redirect_slashes
+            and scope["type"] == "http"
+            and get_route_path(scope) != "/"
+            and state.fallback_router.matches_any(redirect_scope := _redirect_scope(scope), path)
+        ):
+            await RedirectResponse(url=str(URL(scope=redirect_scope)))(scope, receive, send)
+            return
+
+        await self.default(scope, receive, send)
+
+    async def method_not_allowed(self, scope: Scope, receive: Receive, send: Send, allowed: Methods) -> None:
+        headers = {"Allow": ", ".join(sorted(allowed))}
+
+        if "app" in scope:
+            raise HTTPException(status_code=405, headers=headers)
+
+        response = PlainTextResponse("Method Not Allowed", status_code=405, headers=headers)
+        await response(scope, receive, send)
+
 
 def init_app(
     app: FastAPI,
     radixer: Radixer | None = None,
 ) -> None:
-    radixer = radixer or Radixer()
+    app.router = _adopt_router(radixer or Radixer(), app.router)
+
 
+def _adopt_router(radixer: Radixer, router: Router) -> Radixer:
     # there is no way to change default router in FastAPI, so we copy all attributes
-    # from app.router to radixer and then add all existing routes to radixer
-    radixer.__dict__.update(app.router.__dict__)
+    # from the router to radixer and then add all existing routes to radixer
+    radixer.__dict__.update(router.__dict__)
+    radixer.add_routes(router.routes)
 
-    for route in app.router.routes:
-        radixer.try_add_route(route)
+    # lifespan_context was overwritten by the router one
+    radixer.wrap_lifespan()
 
-    app.router = radixer
+    return radixer
 
 
 __all__ = [
+    "CoverageReport",
     "Radixer",
+    "RebuildInfo",
+    "RouterState",
     "init_app",
 ]
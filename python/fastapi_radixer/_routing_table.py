@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from functools import partial
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, cast
 
 import rich
 from rich.tree import Tree
 from starlette.routing import Route
 
-from .parser import param_priority_key, parse_param_part
+from ._compiled import SUPPORTED_METHODS, CompiledTrie, compile_trie, load_compiled_trie
 from .types import (
     Method,
     Methods,
@@ -19,181 +23,195 @@ from .types import (
     StaticRouteDecl,
     is_param_path_part,
     is_param_route,
+    is_pattern_path_part,
     is_static_path_part,
     is_static_route,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
 
-@dataclass
-class LookupResult:
-    route_decl: RouteDecl
-    args: list[Any]
+    from starlette.routing import BaseRoute
 
+    from ._cache import LookupCache
+    from ._snapshot import Snapshot
 
-@dataclass
-class RoutingTrie:
-    methods: Methods = field(default_factory=set)
 
-    leafs: list[ParamRouteDecl] = field(default_factory=list)
+# leafs keep only what the compiled trie needs, path parts of a route are dropped once it's added
+@dataclass(frozen=True, slots=True)
+class RouteLeaf:
+    route: Route
+    methods: frozenset[Method]
+    params: tuple[str, ...]
 
-    static_parts: dict[Path, RoutingTrie] = field(default_factory=dict)
-    param_parts: dict[ParamType, RoutingTrie] = field(default_factory=dict)
 
-    radix_node: tuple[Path, RoutingTrie] | None = None
+# there are only a few distinct method sets, so nodes and leafs share them
+_METHOD_SETS: dict[frozenset[Method], frozenset[Method]] = {}
 
-    def dump(self, tree: Tree) -> None:
-        if self.radix_node:
-            path, node = self.radix_node
-            sub_tree = tree.add(path)
-            node.dump(sub_tree)
-            return
+# empty containers are shared by all nodes and replaced by own ones on the first insert,
+# most of the nodes are either leafs or have only static children
+_NO_PARTS: Mapping[Any, RoutingTrie] = MappingProxyType({})
 
-        for path, node in self.static_parts.items():
-            sub_tree = tree.add(path)
-            node.dump(sub_tree)
 
-        for param_type, node in self.param_parts.items():
-            sub_tree = tree.add(f"{{{param_type}}}")
-            node.dump(sub_tree)
+def _method_set(methods: Iterable[Method]) -> frozenset[Method]:
+    methods = frozenset(methods)
+    return _METHOD_SETS.setdefault(methods, methods)
 
-    def prepare_trie(self) -> None:
-        self.param_parts = {k: self.param_parts[k] for k in sorted(self.param_parts, key=param_priority_key)}
 
-        for trie in self.param_parts.values():
-            trie.prepare_trie()
+def _child[K](parts: Mapping[K, RoutingTrie], key: K) -> tuple[dict[K, RoutingTrie], RoutingTrie]:
+    parts = parts if isinstance(parts, dict) else {}
 
-        for trie in self.static_parts.values():
-            trie.prepare_trie()
+    if key not in parts:
+        parts[key] = RoutingTrie()
 
-        if self.param_parts:
-            return
+    return parts, parts[key]
 
-        if self.leafs:
-            return
 
-        if len(self.static_parts) != 1:
-            return
-
-        ((path, trie),) = self.static_parts.items()
+@dataclass(slots=True)
+class RoutingTrie:
+    methods: frozenset[Method] = frozenset()
 
-        if next_node := trie.radix_node:
-            subpath, subnode = next_node
-            self.radix_node = f"{path}/{subpath}", subnode
-        else:
-            self.radix_node = path, trie
+    leafs: tuple[RouteLeaf, ...] = ()
 
-    def add_route(self, route: ParamRouteDecl, parts: list[PathPart]) -> None:
-        self.methods.update(route["methods"])
+    static_parts: Mapping[Path, RoutingTrie] = _NO_PARTS
+    param_parts: Mapping[ParamType, RoutingTrie] = _NO_PARTS
+    # keyed by (prefix, suffix, param type)
+    pattern_parts: Mapping[tuple[Path, Path, ParamType], RoutingTrie] = _NO_PARTS
 
-        if not parts:
-            self.leafs.append(route)
-            return
+    def dump(self, tree: Tree) -> None:
+        for path, node in self.static_parts.items():
+            sub_tree = tree.add(path)
+            node.dump(sub_tree)
 
-        part, *rest = parts
+        for (prefix, suffix, param_type), node in self.pattern_parts.items():
+            sub_tree = tree.add(f"{prefix}{{{param_type}}}{suffix}")
+            node.dump(sub_tree)
 
-        if is_static_path_part(part):
-            if part["path"] not in self.static_parts:
-                self.static_parts[part["path"]] = RoutingTrie()
+        for param_type, node in self.param_parts.items():
+            sub_tree = tree.add(f"{{{param_type}}}")
+            node.dump(sub_tree)
 
-            self.static_parts[part["path"]].add_route(route, rest)
-        elif is_param_path_part(part):
-            if part["type"] not in self.param_parts:
-                self.param_parts[part["type"]] = RoutingTrie()
+    def add_route(self, route: ParamRouteDecl, parts: Sequence[PathPart]) -> None:
+        leaf = RouteLeaf(
+            route=cast(Route, route["route"]),
+            methods=_method_set(route["methods"]),
+            params=tuple(map(sys.intern, route["params"])),
+        )
+        node = self
 
-            self.param_parts[part["type"]].add_route(route, rest)
-        else:
-            raise ValueError("Unknown path part type")
+        # targets are assigned left to right, so the parts of the current node are set before moving to the child
+        for part in parts:
+            node.methods = _method_set(node.methods | leaf.methods)
 
-    def _leaf_lookup(self, method: Method) -> LookupResult | None:
-        for leaf in self.leafs:
-            if method in leaf["methods"]:
-                return LookupResult(
-                    route_decl=leaf,
-                    args=[],
-                )
+            if is_static_path_part(part):
+                node.static_parts, node = _child(node.static_parts, sys.intern(part["path"]))
+            elif is_param_path_part(part):
+                node.param_parts, node = _child(node.param_parts, part["type"])
+            elif is_pattern_path_part(part):
+                key = sys.intern(part["prefix"]), sys.intern(part["suffix"]), part["type"]
+                node.pattern_parts, node = _child(node.pattern_parts, key)
+            else:
+                raise ValueError("Unknown path part type")
 
-        return None
+        node.methods = _method_set(node.methods | leaf.methods)
+        node.leafs = (*node.leafs, leaf)
 
-    def _radix_lookup(self, method: Method, path: Path) -> LookupResult | None:
-        if node := self.radix_node:
-            subpath, subnode = node
 
-            if path.startswith(subpath):
-                return subnode.lookup(method, path[len(subpath) + 1 :])
+@dataclass
+class RoutingTable:
+    route_trie: RoutingTrie = field(default_factory=RoutingTrie)
+    # only routes are kept, their decls are dropped once added
+    static_routes: dict[Path, dict[Method, Route]] = field(default_factory=dict)
 
-        return None
+    compiled: CompiledTrie | None = None
 
-    def _static_lookup(self, method: Method, part: Path, rest: Path) -> LookupResult | None:
-        if trie := self.static_parts.get(part):
-            return trie.lookup(method, rest)
+    # optional cache of param route lookups, keyed by (method, path)
+    cache: LookupCache[tuple[Method, Path], tuple[Route, dict[str, Any]]] | None = None
+    # optional cache of recently missed (method, path) pairs, e.g. for scanners repeating the same urls
+    negative_cache: LookupCache[tuple[Method, Path], bool] | None = None
 
-        return None
+    # when disabled, params are returned as raw strings, e.g. for FastAPI routes that validate them anyway
+    convert_params: bool = True
 
-    def _param_lookup(self, method: Method, part: Path, rest: Path) -> LookupResult | None:
-        for param_type, trie in self.param_parts.items():
-            is_valid, parsed = parse_param_part(param_type, part)
+    # loads param routes of a table restored from a snapshot, they are added to the trie only once it's changed
+    pending_routes: Callable[[], list[RouteDecl]] | None = None
 
-            if not is_valid:
-                continue
+    def dump(self) -> None:
+        self.build_trie()
+        tree = Tree("/")
 
-            if res := trie.lookup(method, rest):
-                res.args.insert(0, parsed)
-                return res
+        for path in self.static_routes:
+            tree.add(path)
+        self.route_trie.dump(tree)
 
-        return None
+        rich.print(tree)
 
-    def lookup(self, method: Method, path: Path) -> LookupResult | None:
-        if not path:
-            return self._leaf_lookup(method)
+    def empty_copy(self) -> RoutingTable:
+        # caches are not shared, entries of this table must not be served by the new one
+        return RoutingTable(
+            cache=None if self.cache is None else self.cache.empty_copy(),
+            negative_cache=None if self.negative_cache is None else self.negative_cache.empty_copy(),
+            convert_params=self.convert_params,
+        )
 
-        if self.radix_node:
-            return self._radix_lookup(method, path)
+    def prepare(self) -> None:
+        if self.compiled is None:
+            self.compiled = compile_trie(self.route_trie, convert_params=self.convert_params)
 
-        try:
-            part, rest = path.split("/", maxsplit=1)
-        except ValueError:
-            part, rest = path, ""
+    def add_static_route(self, route: StaticRouteDecl) -> None:
+        routes = self.static_routes.setdefault(route["path"], {})
 
-        if res := self._static_lookup(method, part, rest):
-            return res
+        # first registered route wins, same as in starlette
+        for method in route["methods"]:
+            routes.setdefault(method, cast(Route, route["route"]))
 
-        if res := self._param_lookup(method, part, rest):
-            return res
+        if self.negative_cache is not None:
+            self.negative_cache.clear()
 
-        return None
+    def add_param_route(self, route: ParamRouteDecl) -> None:
+        self.build_trie()
+        self.route_trie.add_route(route, route["parts"])
 
+        # once prepared, changes are compiled into a new table and published with a single assignment
+        if self.compiled is not None:
+            self.compiled = compile_trie(self.route_trie, convert_params=self.convert_params)
 
-@dataclass
-class RoutingTable:
-    route_trie: RoutingTrie = field(default_factory=RoutingTrie)
-    static_routes: dict[tuple[str, Method], StaticRouteDecl] = field(default_factory=dict)
+        if self.cache is not None:
+            self.cache.clear()
 
-    trie_prepared: bool = False
+        if self.negative_cache is not None:
+            self.negative_cache.clear()
 
-    def dump(self) -> None:
-        tree = Tree("/")
+    def build_trie(self) -> None:
+        if self.pending_routes is None:
+            return
 
-        for path, _ in self.static_routes:
-            tree.add(path)
-        self.route_trie.dump(tree)
+        pending, self.pending_routes = self.pending_routes(), None
 
-        rich.print(tree)
+        for route in pending:
+            if is_param_route(route):
+                self.route_trie.add_route(route, route["parts"])
 
-    def prepare(self) -> None:
-        if self.trie_prepared:
-            return
+    def dump_state(self, routes: list[BaseRoute]) -> tuple[Any, ...]:
+        self.prepare()
+        positions = {id(route): position for position, route in enumerate(routes)}
 
-        self.route_trie.prepare_trie()
-        self.trie_prepared = True
+        return cast(CompiledTrie, self.compiled).dump_state(positions)
 
-    def add_static_route(self, route: StaticRouteDecl) -> None:
-        for method in route["methods"]:
-            self.static_routes[(route["path"], method)] = route
+    def restore(self, snapshot: Snapshot) -> None:
+        # the compiled trie is loaded as is, so neither the trie is built nor compiled on startup
+        for decl in snapshot.decls("static"):
+            self.add_static_route(cast(StaticRouteDecl, decl))
 
-    def add_param_route(self, route: ParamRouteDecl) -> None:
-        self.route_trie.add_route(route, route["parts"])
+        self.pending_routes = partial(snapshot.decls, "param")
+        self.compiled = load_compiled_trie(snapshot.table_state, snapshot.routes, convert_params=self.convert_params)
 
     def add_route(self, route: RouteDecl) -> None:
+        # same as in the native table, routes with other methods are left to the fallback router by the parser
+        if unsupported := route["methods"] - SUPPORTED_METHODS:
+            msg = f"Unsupported methods {sorted(unsupported)}"
+            raise ValueError(msg)
+
         if is_static_route(route):
             self.add_static_route(route)
         elif is_param_route(route):
@@ -202,19 +220,79 @@ class RoutingTable:
             raise ValueError("route must be static or param")
 
     def lookup(self, method: Method, path: Path) -> tuple[Route, dict[str, Any]] | None:
-        if res := self.static_routes.get((path, method)):
-            return res["route"], {}
+        if (routes := self.static_routes.get(path)) and (res := routes.get(method)):
+            return res, {}
+
+        if not self.compiled:
+            return None
+
+        if self.cache is None and self.negative_cache is None:
+            return self.compiled.lookup(method, path)
+
+        return self._cached_lookup(self.compiled, method, path)
+
+    def _cached_lookup(self, compiled: CompiledTrie, method: Method, path: Path) -> tuple[Route, dict[str, Any]] | None:
+        key = method, path
+
+        # cached params stay private, callers may change the returned dict
+        if self.cache is not None and (res := self.cache.get(key)):
+            route, params = res
+            return route, params.copy()
+
+        if self.negative_cache is not None and self.negative_cache.get(key):
+            return None
+
+        if (res := compiled.lookup(method, path)) is None:
+            if self.negative_cache is not None:
+                self.negative_cache.set(key, value=True)
+        elif self.cache is not None:
+            route, params = res
+            self.cache.set(key, (route, params.copy()))
+
+        return res
+
+    def lookup_many(
+        self,
+        pairs: Iterable[tuple[Method, Path]],
+        threads: int = 1,
+    ) -> list[tuple[Route, dict[str, str]] | None]:
+        self.prepare()
+        pairs = [*pairs]
+
+        if threads <= 1 or len(pairs) < threads:
+            return self._lookup_chunk(pairs)
+
+        # splitting only pays off on free-threaded python, otherwise threads take turns holding the GIL
+        size = -(-len(pairs) // threads)
+        chunks = [pairs[i : i + size] for i in range(0, len(pairs), size)]
+
+        with ThreadPoolExecutor(threads) as executor:
+            return [res for chunk in executor.map(self._lookup_chunk, chunks) for res in chunk]
+
+    def _lookup_chunk(self, pairs: list[tuple[Method, Path]]) -> list[tuple[Route, dict[str, str]] | None]:
+        static_routes = self.static_routes
+        lookup_raw = cast(CompiledTrie, self.compiled).lookup_raw
+        results: list[tuple[Route, dict[str, str]] | None] = []
+
+        for method, path in pairs:
+            if (routes := static_routes.get(path)) and (res := routes.get(method)):
+                results.append((res, {}))
+            else:
+                results.append(lookup_raw(method, path))
+
+        return results
 
-        if res := self.route_trie.lookup(method, path):
-            route = res.route_decl["route"]
-            params = {p: res.args[i] for i, p in enumerate(res.route_decl["params"])}
+    def allowed_methods(self, path: Path) -> Methods:
+        methods: Methods = set(self.static_routes.get(path, ()))
 
-            return route, params
+        if self.compiled:
+            methods |= self.compiled.allowed_methods(path)
 
-        return None
+        return methods
 
 
 __all__ = [
+    "RouteLeaf",
     "RoutingTable",
     "RoutingTrie",
 ]
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import mmap
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path as FilePath
+from typing import TYPE_CHECKING, Any, cast
+
+from starlette.routing import BaseRoute, Host, Mount, Route, WebSocketRoute
+
+from .parser import custom_param_types
+from .types import PathPart, RouteDecl
+
+if TYPE_CHECKING:
+    from os import PathLike
+
+# bumped on any change of the snapshot layout, older snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+
+def _route_signature(route: BaseRoute) -> tuple[Any, ...]:
+    match route:
+        case Host():
+            return "host", route.host
+        case Route() | WebSocketRoute() | Mount():
+            # param names are a part of the path format, convertors follow it in order
+            methods = sorted(getattr(route, "methods", None) or ())
+            convertors = [type(convertor).__qualname__ for convertor in route.param_convertors.values()]
+            return type(route).__qualname__, route.path_format, methods, convertors
+        case _:
+            return (type(route).__qualname__,)
+
+
+def route_fingerprint(routes: list[BaseRoute], options: tuple[Any, ...] = ()) -> str:
+    # routes are mapped back by position, so the order is a part of the fingerprint,
+    # custom param types and table options change how the same routes are indexed and matched
+    signatures = [SNAPSHOT_VERSION, custom_param_types(), options, *map(_route_signature, routes)]
+    return hashlib.blake2b(repr(signatures).encode(), digest_size=16).hexdigest()
+
+
+def _encode_part(part: PathPart) -> tuple[str, ...]:
+    match part:
+        case {"key": "static", "path": path}:
+            return "static", path
+        case {"key": "param", "name": name, "type": param_type}:
+            return "param", name, param_type
+        case {"key": "pattern", "name": name, "type": param_type, "prefix": prefix, "suffix": suffix}:
+            return "pattern", name, param_type, prefix, suffix
+        case _:
+            msg = f"Unknown path part {part!r}"
+            raise ValueError(msg)
+
+
+def _decode_part(part: tuple[str, ...]) -> PathPart:
+    match part:
+        case ("static", path):
+            return {"key": "static", "path": path}
+        case ("param", name, param_type):
+            return cast(PathPart, {"key": "param", "name": name, "type": param_type})
+        case ("pattern", name, param_type, prefix, suffix):
+            return cast(
+                PathPart,
+                {"key": "pattern", "name": name, "type": param_type, "prefix": prefix, "suffix": suffix},
+            )
+        case _:
+            msg = f"Unknown path part {part!r}"
+            raise ValueError(msg)
+
+
+def _encode_decl(decl: RouteDecl, position: int) -> tuple[Any, ...]:
+    methods = tuple(sorted(decl["methods"]))
+
+    if decl["key"] == "static":
+        return position, "static", methods, decl["path"]
+
+    return (
+        position,
+        "param",
+        methods,
+        decl["path"],
+        tuple(map(_encode_part, decl["parts"])),
+        tuple(decl["params"]),
+    )
+
+
+def _decode_decl(data: tuple[Any, ...], routes: list[BaseRoute]) -> RouteDecl:
+    position, key, methods, path, *rest = data
+
+    if key == "static":
+        return {"key": "static", "route": routes[position], "methods": set(methods), "path": path}
+
+    parts, params = rest
+    return {
+        "key": "param",
+        "route": routes[position],
+        "methods": set(methods),
+        "path": path,
+        "parts": [_decode_part(part) for part in parts],
+        "params": [*params],
+    }
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    routes: list[BaseRoute]
+    # indexed routes in registration order, decoded on demand
+    encoded_decls: list[tuple[Any, ...]]
+    hosts: list[Host]
+    fallback: list[BaseRoute]
+    # engine specific state, e.g. the compiled trie of the python routing table
+    table_state: Any
+
+    def decls(self, key: str | None = None) -> list[RouteDecl]:
+        return [_decode_decl(decl, self.routes) for decl in self.encoded_decls if key is None or decl[1] == key]
+
+
+def encode_snapshot(
+    routes: list[BaseRoute],
+    decls: list[RouteDecl],
+    fallback: list[BaseRoute],
+    table_state: Any,
+    options: tuple[Any, ...] = (),
+) -> bytes:
+    positions = {id(route): position for position, route in enumerate(routes)}
+    fallback_ids = {id(route) for route in fallback}
+
+    return marshal.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "fingerprint": route_fingerprint(routes, options),
+            "decls": [_encode_decl(decl, positions[id(decl["route"])]) for decl in decls],
+            "hosts": [
+                position
+                for position, route in enumerate(routes)
+                if isinstance(route, Host) and id(route) not in fallback_ids
+            ],
+            "fallback": [positions[id(route)] for route in fallback],
+            "table_state": table_state,
+        },
+    )
+
+
+def decode_snapshot(
+    data: bytes | mmap.mmap,
+    routes: list[BaseRoute],
+    options: tuple[Any, ...] = (),
+) -> Snapshot | None:
+    try:
+        # snapshots are written by the app itself, they must not come from untrusted sources
+        payload = marshal.loads(data)  # noqa: S302
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    # a snapshot of another version or of other routes is stale, routes are indexed from scratch
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != SNAPSHOT_VERSION
+        or payload.get("fingerprint") != route_fingerprint(routes, options)
+    ):
+        return None
+
+    return Snapshot(
+        routes=routes,
+        encoded_decls=payload["decls"],
+        hosts=[cast(Host, routes[position]) for position in payload["hosts"]],
+        fallback=[routes[position] for position in payload["fallback"]],
+        table_state=payload["table_state"],
+    )
+
+
+def read_snapshot_file(
+    path: str | PathLike[str],
+    routes: list[BaseRoute],
+    options: tuple[Any, ...] = (),
+) -> Snapshot | None:
+    path = FilePath(path)
+
+    if not path.is_file() or not path.stat().st_size:
+        return None
+
+    # marshal decodes the whole snapshot, the mapping only spares reading the file into a bytes copy first
+    with path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return decode_snapshot(data, routes, options)
+
+
+def write_snapshot_file(path: str | PathLike[str], data: bytes) -> None:
+    target = FilePath(path)
+
+    # written aside and renamed, so concurrently starting workers never read a partial file
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+
+        FilePath(tmp).replace(target)
+    except BaseException:
+        FilePath(tmp).unlink(missing_ok=True)
+        raise
+
+
+__all__ = [
+    "SNAPSHOT_VERSION",
+    "Snapshot",
+    "decode_snapshot",
+    "encode_snapshot",
+    "read_snapshot_file",
+    "route_fingerprint",
+    "write_snapshot_file",
+]
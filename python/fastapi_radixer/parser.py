@@ -1,17 +1,20 @@
 import math
+import re
 import uuid
 from collections.abc import Callable, Iterator
-from typing import Any, cast
+from typing import Any, cast, get_args
 
 from starlette.convertors import (
+    CONVERTOR_TYPES,
     Convertor,
     FloatConvertor,
     IntegerConvertor,
     PathConvertor,
     StringConvertor,
     UUIDConvertor,
+    register_url_convertor,
 )
-from starlette.routing import Route
+from starlette.routing import BaseRoute, Mount, Route, WebSocketRoute
 
 from .types import (
     Method,
@@ -20,10 +23,12 @@ from .types import (
     ParamRouteDecl,
     ParamType,
     PathPart,
+    PatternPathPart,
     RouteDecl,
     StaticPathPart,
     StaticRouteDecl,
     is_param_path_part,
+    is_pattern_path_part,
 )
 
 
@@ -31,7 +36,7 @@ def prepare_path(path: str) -> str:
     return path.strip("/")
 
 
-_PARAM_TYPE_PRIORITY: dict[ParamType, int] = {
+_PARAM_TYPE_PRIORITY: dict[ParamType, float] = {
     "uuid": 0,
     "int": 1,
     "float": 2,
@@ -39,12 +44,58 @@ _PARAM_TYPE_PRIORITY: dict[ParamType, int] = {
     "path": 4,
 }
 
-_PARAM_VALIDATORS: dict[ParamType, Callable[[str], Any]] = {
+
+# scanners mirror the regexes of starlette.convertors and decide match/no-match without raising,
+# so a segment that does not match a param type costs no exception
+def _scan_int(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+def _scan_float(value: str) -> bool:
+    head, sep, tail = value.partition(".")
+    return value.isascii() and head.isdigit() and (not sep or tail.isdigit())
+
+
+_HEX_DIGITS = "0123456789abcdef"
+_UUID_RE = re.compile(r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}")
+
+
+def _scan_uuid(value: str) -> bool:
+    match len(value):
+        case 36:
+            dashes = value[8] == value[13] == value[18] == value[23] == "-" and value.count("-") == 4  # noqa: PLR2004
+            return dashes and not value.replace("-", "").strip(_HEX_DIGITS)
+        case 32:
+            return not value.strip(_HEX_DIGITS)
+        # forms with only some of the dashes are rare, so the regex is good enough for them
+        case 33 | 34 | 35:
+            return _UUID_RE.fullmatch(value) is not None
+        case _:
+            return False
+
+
+def _scan_str(value: str) -> bool:
+    return bool(value) and "/" not in value
+
+
+def _scan_path(_: str) -> bool:
+    return True
+
+
+_PARAM_SCANNERS: dict[ParamType, Callable[[str], bool]] = {
+    "uuid": _scan_uuid,
+    "int": _scan_int,
+    "float": _scan_float,
+    "str": _scan_str,
+    "path": _scan_path,
+}
+
+_PARAM_CONVERTERS: dict[ParamType, Callable[[str], Any]] = {
     "uuid": uuid.UUID,
     "int": int,
     "float": float,
-    "str": lambda v: "/" not in v,
-    "path": lambda: True,
+    "str": str,
+    "path": str,
 }
 
 
@@ -52,16 +103,105 @@ def param_priority_key(param_type: ParamType) -> float:
     return _PARAM_TYPE_PRIORITY.get(param_type, math.inf)
 
 
+def param_scanner(param_type: ParamType) -> Callable[[str], bool]:
+    return _PARAM_SCANNERS[param_type]
+
+
+def scan_param_part(param_type: ParamType, value: str) -> bool:
+    return _PARAM_SCANNERS[param_type](value)
+
+
 def parse_param_part(param_type: ParamType, value: str) -> tuple[bool, Any]:
-    try:
-        val = _PARAM_VALIDATORS[param_type](value)
-    except (ValueError, TypeError, AssertionError):
+    if not _PARAM_SCANNERS[param_type](value):
         return False, None
-    else:
-        return True, val
+
+    return True, _PARAM_CONVERTERS[param_type](value)
+
+
+# custom convertors are matched by instance, starlette shares one instance per convertor name
+_CUSTOM_PARAM_TYPES: dict[Convertor, ParamType] = {}
+
+# custom params are tried after the built-in typed params and before "str", that matches any segment
+_CUSTOM_PARAM_PRIORITY = 2.5
+
+
+def _regex_scanner(regex: str) -> Callable[[str], bool]:
+    pattern = re.compile(regex)
+
+    def _scan(value: str) -> bool:
+        return pattern.fullmatch(value) is not None
+
+    return _scan
+
+
+def _charset_scanner(charset: str, validator: Callable[[str], bool]) -> Callable[[str], bool]:
+    def _scan(value: str) -> bool:
+        return bool(value) and not value.strip(charset) and validator(value)
+
+    return _scan
+
+
+def register_param_type(
+    name: str,
+    convertor: Convertor,
+    *,
+    validator: Callable[[str], bool] | None = None,
+    priority: float = _CUSTOM_PARAM_PRIORITY,
+    charset: str | None = None,
+) -> None:
+    if name in _PARAM_TYPE_PRIORITY and convertor not in _CUSTOM_PARAM_TYPES:
+        msg = f"Param type {name!r} is already registered"
+        raise ValueError(msg)
+
+    # the validator must not raise, by default it's the convertor regex
+    scanner = validator or _regex_scanner(convertor.regex)
+
+    # cheap check that every char of the segment belongs to the charset, done before the validator
+    if charset is not None:
+        scanner = _charset_scanner(charset, scanner)
+
+    param_type = cast(ParamType, name)
+
+    _PARAM_TYPE_PRIORITY[param_type] = priority
+    _PARAM_SCANNERS[param_type] = scanner
+    _PARAM_CONVERTERS[param_type] = convertor.convert
+    _CUSTOM_PARAM_TYPES[convertor] = param_type
+
+    register_url_convertor(name, convertor)
+
+
+def unregister_param_type(name: str) -> None:
+    param_type = cast(ParamType, name)
+    convertors = [convertor for convertor, custom in _CUSTOM_PARAM_TYPES.items() if custom == param_type]
+
+    # built-in types can't be removed
+    if not convertors:
+        msg = f"Param type {name!r} is not registered"
+        raise ValueError(msg)
+
+    for convertor in convertors:
+        del _CUSTOM_PARAM_TYPES[convertor]
+
+    del _PARAM_TYPE_PRIORITY[param_type]
+    del _PARAM_SCANNERS[param_type]
+    del _PARAM_CONVERTERS[param_type]
+
+    CONVERTOR_TYPES.pop(name, None)
+
+
+def custom_param_types() -> list[tuple[ParamType, str, float]]:
+    # registered custom types with their convertors and priorities, e.g. for snapshot fingerprints
+    return sorted(
+        (param_type, type(convertor).__qualname__, _PARAM_TYPE_PRIORITY[param_type])
+        for convertor, param_type in _CUSTOM_PARAM_TYPES.items()
+    )
 
 
 def convertor_to_param_type(convertor: Convertor) -> ParamType | None:
+    return _CUSTOM_PARAM_TYPES.get(convertor) or _builtin_param_type(convertor)
+
+
+def _builtin_param_type(convertor: Convertor) -> ParamType | None:
     match convertor:
         case StringConvertor():
             return "str"
@@ -77,37 +217,95 @@ def convertor_to_param_type(convertor: Convertor) -> ParamType | None:
             return None
 
 
+_PARAM_SEGMENT_RE = re.compile(r"^(?P<prefix>[^{}]*)\{(?P<name>[^{}]+)\}(?P<suffix>[^{}]*)$")
+
+
 def path_parts_iter(
     path: str,
     params: dict[str, ParamType],
 ) -> Iterator[PathPart]:
     for part in path.split("/"):
-        if part.startswith("{") and part.endswith("}"):
-            param_name = part[1:-1]
-            param_type = params.get(param_name)
+        if "{" not in part:
+            yield StaticPathPart(
+                key="static",
+                path=part,
+            )
+            continue
 
-            if param_type is None:
-                continue
+        # segments with several params or unknown params are skipped, so such route is not indexed
+        if not (match := _PARAM_SEGMENT_RE.match(part)):
+            continue
 
-            yield ParamPathPart(
-                key="param",
+        prefix, param_name, suffix = match.group("prefix", "name", "suffix")
+        param_type = params.get(param_name)
+
+        if param_type is None:
+            continue
+
+        if prefix or suffix:
+            yield PatternPathPart(
+                key="pattern",
                 name=param_name,
                 type=param_type,
+                prefix=prefix,
+                suffix=suffix,
             )
         else:
-            yield StaticPathPart(
-                key="static",
-                path=part,
+            yield ParamPathPart(
+                key="param",
+                name=param_name,
+                type=param_type,
             )
 
 
-def parse_route(route: Route) -> RouteDecl | None:
+_ALL_METHODS: Methods = {*get_args(Method.__value__)}
+# methods of http routes the tables index, routes with any other method, e.g. "PROPFIND", are not indexed
+# and requests with any other method are looked up by the "*" pseudo method
+HTTP_METHODS: frozenset[Method] = frozenset(_ALL_METHODS - {"WEBSOCKET", "*"})
+
+
+def route_methods(route: BaseRoute) -> Methods | None:
+    match route:
+        # routes to class endpoints accept any method, the endpoint dispatches them
+        case Route() if route.methods is not None and {m.upper() for m in route.methods} <= HTTP_METHODS:
+            return {cast(Method, m.upper()) for m in route.methods}
+        case WebSocketRoute():
+            return {"WEBSOCKET"}
+        # mount is a "path" tail that accepts any method, including the "*" pseudo method, and websockets
+        case Mount():
+            return {*_ALL_METHODS}
+        case _:
+            return None
+
+
+def _route_params(route: Route | WebSocketRoute | Mount) -> dict[str, ParamType] | str:
+    params: dict[str, ParamType] = {}
+
+    for key, convertor in route.param_convertors.items():
+        if (param_type := convertor_to_param_type(convertor)) is None:
+            return f"unknown convertor {type(convertor).__name__} of param {key!r}"
+
+        params[key] = param_type
+
+    return params
+
+
+def _unsupported_reason(route: BaseRoute) -> str:
+    if not isinstance(route, Route):
+        return f"{type(route).__name__} is not supported"
+
+    return "route accepts any method" if route.methods is None else "route has non-standard methods"
+
+
+def _parse_route(route: BaseRoute) -> RouteDecl | str:
+    if (methods := route_methods(route)) is None:
+        return _unsupported_reason(route)
+
+    route = cast(Route | WebSocketRoute | Mount, route)
     path = prepare_path(route.path_format)
-    methods: Methods = {cast(Method, m.upper()) for m in route.methods or ()}
-    params = {key: convertor_to_param_type(value) for key, value in route.param_convertors.items()}
 
-    if any(v is None for v in params.values()):
-        return None
+    if isinstance(params := _route_params(route), str):
+        return params
 
     if not params:
         return StaticRouteDecl(
@@ -117,8 +315,16 @@ def parse_route(route: Route) -> RouteDecl | None:
             path=path,
         )
 
-    params = cast(dict[str, ParamType], params)
     parts = [*path_parts_iter(path, params)]
+    param_parts = [p for p in parts if is_param_path_part(p) or is_pattern_path_part(p)]
+
+    # every param must be captured by exactly one part
+    if len(param_parts) != len(params):
+        return "several params in one segment"
+
+    # "path" params are matched as a tail of the path, so they must be the last part and can't have a pattern
+    if any(p["type"] == "path" and (p is not parts[-1] or is_pattern_path_part(p)) for p in param_parts):
+        return "path param is not a whole last segment"
 
     return ParamRouteDecl(
         key="param",
@@ -126,13 +332,31 @@ def parse_route(route: Route) -> RouteDecl | None:
         methods=methods,
         path=path,
         parts=parts,
-        params=[p["name"] for p in parts if is_param_path_part(p)],
+        params=[p["name"] for p in param_parts],
     )
 
 
+def parse_route(route: BaseRoute) -> RouteDecl | None:
+    decl = _parse_route(route)
+    return None if isinstance(decl, str) else decl
+
+
+def unindexed_reason(route: BaseRoute) -> str | None:
+    decl = _parse_route(route)
+    return decl if isinstance(decl, str) else None
+
+
 __all__ = [
+    "HTTP_METHODS",
+    "custom_param_types",
     "param_priority_key",
+    "param_scanner",
     "parse_param_part",
     "parse_route",
     "prepare_path",
+    "register_param_type",
+    "route_methods",
+    "scan_param_part",
+    "unindexed_reason",
+    "unregister_param_type",
 ]
@@ -1,6 +1,6 @@
 from typing import Any, Literal, TypedDict
 
-from starlette.routing import Route
+from starlette.routing import BaseRoute
 from typing_extensions import TypeIs
 
 type Method = Literal[
@@ -11,6 +11,10 @@ type Method = Literal[
     "PATCH",
     "HEAD",
     "OPTIONS",
+    # pseudo method of websocket routes, so they are indexed by the same table
+    "WEBSOCKET",
+    # pseudo method of any other http method, only mounts accept it
+    "*",
 ]
 type Methods = set[Method]
 
@@ -28,7 +32,7 @@ type ParsedParams = dict[str, Any]
 
 
 class BaseRouteDecl(TypedDict):
-    route: Route
+    route: BaseRoute
     methods: set[Method]
 
 
@@ -48,7 +52,15 @@ class StaticPathPart(TypedDict):
     path: Path
 
 
-type PathPart = StaticPathPart | ParamPathPart
+class PatternPathPart(TypedDict):
+    key: Literal["pattern"]
+    name: str
+    type: ParamType
+    prefix: Path
+    suffix: Path
+
+
+type PathPart = StaticPathPart | ParamPathPart | PatternPathPart
 
 
 class ParamRouteDecl(BaseRouteDecl):
@@ -77,6 +89,10 @@ def is_param_path_part(part: PathPart) -> TypeIs[ParamPathPart]:
     return part["key"] == "param"
 
 
+def is_pattern_path_part(part: PathPart) -> TypeIs[PatternPathPart]:
+    return part["key"] == "pattern"
+
+
 __all__ = [
     "BaseRouteDecl",
     "Method",
@@ -87,11 +103,13 @@ __all__ = [
     "ParsedParams",
     "Path",
     "PathPart",
+    "PatternPathPart",
     "RouteDecl",
     "StaticPathPart",
     "StaticRouteDecl",
     "is_param_path_part",
     "is_param_route",
+    "is_pattern_path_part",
     "is_static_path_part",
     "is_static_route",
 ]
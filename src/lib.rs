@@ -1,6 +1,710 @@
+use std::collections::{HashMap, HashSet};
+use std::sync::{Arc, PoisonError, RwLock};
+
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyString};
+
+type Methods = u16;
+
+// "WEBSOCKET" and "*" are pseudo methods of websocket routes and of any other http method, same as in types.py
+const METHODS: [&str; 9] = ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS", "WEBSOCKET", "*"];
+const ALL_METHODS: Methods = (1 << METHODS.len()) - 1;
+
+fn method_index(method: &str) -> Option<usize> {
+    METHODS.iter().position(|&m| m == method)
+}
+
+// method-indexed leaf table, first registered route wins like in starlette
+#[derive(Clone, Default)]
+struct Leafs {
+    routes: [Option<usize>; METHODS.len()],
+    mask: Methods,
+}
+
+impl Leafs {
+    fn insert(&mut self, route: usize, methods: Methods) {
+        for (i, slot) in self.routes.iter_mut().enumerate() {
+            if methods & (1 << i) != 0 && slot.is_none() {
+                *slot = Some(route);
+            }
+        }
+
+        self.mask |= methods;
+    }
+
+    fn methods(&self) -> HashSet<&'static str> {
+        METHODS
+            .iter()
+            .enumerate()
+            .filter(|&(i, _)| self.mask & (1 << i) != 0)
+            .map(|(_, &m)| m)
+            .collect()
+    }
+}
+
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+enum ParamKind {
+    Uuid,
+    Int,
+    Float,
+    Str,
+    Path,
+    // index of a param type from the `register_param_type` registry, see `RoutingTable::custom_params`
+    Custom(usize),
+}
+
+impl ParamKind {
+    fn from_name(name: &str) -> Option<Self> {
+        match name {
+            "uuid" => Some(Self::Uuid),
+            "int" => Some(Self::Int),
+            "float" => Some(Self::Float),
+            "str" => Some(Self::Str),
+            "path" => Some(Self::Path),
+            _ => None,
+        }
+    }
+
+    // same as `_PARAM_TYPE_PRIORITY` in parser.py
+    fn priority(self) -> f64 {
+        match self {
+            Self::Uuid => 0.0,
+            Self::Int => 1.0,
+            Self::Float => 2.0,
+            Self::Str => 3.0,
+            Self::Path => 4.0,
+            Self::Custom(_) => f64::INFINITY,
+        }
+    }
+
+    // mirrors regexes of starlette.convertors
+    fn matches(self, value: &str) -> bool {
+        match self {
+            Self::Uuid => is_uuid(value),
+            Self::Int => is_digits(value),
+            Self::Float => match value.split_once('.') {
+                Some((int, frac)) => is_digits(int) && is_digits(frac),
+                None => is_digits(value),
+            },
+            Self::Str => !value.is_empty(),
+            // "path" params are tail edges, see `RoutingTable::find_tail`,
+            // custom params are matched by python scanners, see `RoutingTable::matches`
+            Self::Path | Self::Custom(_) => false,
+        }
+    }
+}
+
+fn is_digits(value: &str) -> bool {
+    !value.is_empty() && value.bytes().all(|b| b.is_ascii_digit())
+}
+
+// 8-4-4-4-12 hex groups with optional dashes between them
+fn is_uuid(value: &str) -> bool {
+    let mut bytes = value.as_bytes();
+
+    for (i, size) in [8, 4, 4, 4, 12].into_iter().enumerate() {
+        if i > 0 {
+            if let [b'-', rest @ ..] = bytes {
+                bytes = rest;
+            }
+        }
+
+        if bytes.len() < size || !bytes[..size].iter().all(|&b| b.is_ascii_digit() || (b'a'..=b'f').contains(&b)) {
+            return false;
+        }
+
+        bytes = &bytes[size..];
+    }
+
+    bytes.is_empty()
+}
+
+#[derive(Clone, Default)]
+struct Node {
+    statics: HashMap<String, usize>,
+    params: Vec<(ParamKind, usize)>,
+    // params with a static (prefix, suffix) inside a segment, tried after static and before single segment params
+    patterns: Vec<(String, String, ParamKind, usize)>,
+    // "path" param consuming the rest of the path, tried after static and single segment params
+    tail: Option<usize>,
+    leafs: Leafs,
+    // methods of all routes in the subtree, used to prune branches
+    mask: Methods,
+}
+
+struct CustomParam {
+    name: String,
+    scanner: PyObject,
+    priority: f64,
+}
+
+struct RouteEntry {
+    route: PyObject,
+    methods: Methods,
+    keys: Vec<Py<PyString>>,
+    convertors: Vec<PyObject>,
+}
+
+// a param type of a route declaration, custom types unknown to the table are added with the route
+enum ParamSpec {
+    Kind(ParamKind),
+    New(CustomParam),
+}
+
+enum PartSpec {
+    Static(String),
+    Param(ParamSpec),
+    Pattern(String, String, ParamSpec),
+}
+
+enum RouteKey {
+    Static(String),
+    Param(Vec<PartSpec>),
+}
+
+// a route declaration read from python, so it can be inserted into the table without calling python
+struct RouteSpec {
+    entry: RouteEntry,
+    key: RouteKey,
+}
+
+impl RouteSpec {
+    fn read(py: Python<'_>, decl: &Bound<'_, PyAny>, table: &Table) -> PyResult<Self> {
+        let route = decl.get_item("route")?;
+
+        // routes with other methods are left to the fallback router by the parser,
+        // a dropped method bit would make the route silently unreachable
+        let mut methods = 0;
+        for method in decl.get_item("methods")?.try_iter()? {
+            let method = method?.extract::<String>()?;
+
+            let Some(index) = method_index(&method) else {
+                return Err(PyValueError::new_err(format!("Unsupported method {method:?}")));
+            };
+
+            methods |= 1 << index;
+        }
+
+        let mut keys = Vec::new();
+        let mut convertors = Vec::new();
+
+        let key = match decl.get_item("key")?.extract::<String>()?.as_str() {
+            "static" => RouteKey::Static(decl.get_item("path")?.extract()?),
+            "param" => {
+                let param_convertors = route.getattr("param_convertors")?;
+
+                for name in decl.get_item("params")?.try_iter()? {
+                    let name = name?.extract::<String>()?;
+
+                    convertors.push(param_convertors.get_item(name.as_str())?.unbind());
+                    keys.push(PyString::intern(py, &name).unbind());
+                }
+
+                let param_spec = |part: &Bound<'_, PyAny>| -> PyResult<ParamSpec> {
+                    Self::param_spec(py, &part.get_item("type")?.extract::<String>()?, table)
+                };
+                let mut parts = Vec::new();
+
+                for part in decl.get_item("parts")?.try_iter()? {
+                    let part = part?;
+
+                    parts.push(match part.get_item("key")?.extract::<String>()?.as_str() {
+                        "static" => PartSpec::Static(part.get_item("path")?.extract()?),
+                        "param" => PartSpec::Param(param_spec(&part)?),
+                        "pattern" => PartSpec::Pattern(
+                            part.get_item("prefix")?.extract()?,
+                            part.get_item("suffix")?.extract()?,
+                            param_spec(&part)?,
+                        ),
+                        _ => return Err(PyValueError::new_err("Unknown path part type")),
+                    });
+                }
+
+                RouteKey::Param(parts)
+            }
+            _ => return Err(PyValueError::new_err("route must be static or param")),
+        };
+
+        Ok(Self {
+            entry: RouteEntry {
+                route: route.unbind(),
+                methods,
+                keys,
+                convertors,
+            },
+            key,
+        })
+    }
+
+    fn param_spec(py: Python<'_>, name: &str, table: &Table) -> PyResult<ParamSpec> {
+        if let Some(kind) = ParamKind::from_name(name) {
+            return Ok(ParamSpec::Kind(kind));
+        }
+
+        // custom params are only appended, so their indexes stay valid in later versions of the table
+        if let Some(i) = table.custom_params.iter().position(|param| param.name == name) {
+            return Ok(ParamSpec::Kind(ParamKind::Custom(i)));
+        }
+
+        // scanner and priority of a custom param type come from the python registry
+        let parser = py.import("fastapi_radixer.parser")?;
+
+        Ok(ParamSpec::New(CustomParam {
+            name: name.to_owned(),
+            scanner: parser.call_method1("param_scanner", (name,))?.unbind(),
+            priority: parser.call_method1("param_priority_key", (name,))?.extract()?,
+        }))
+    }
+}
+
+#[derive(Clone)]
+struct Table {
+    nodes: Vec<Node>,
+    // python objects are shared between versions of the table, they can't be cloned without the GIL
+    routes: Vec<Arc<RouteEntry>>,
+    static_routes: HashMap<String, Leafs>,
+    custom_params: Vec<Arc<CustomParam>>,
+    // the deepest route params count, used to size the captures buffer once per lookup
+    max_params: usize,
+}
+
+impl Table {
+    fn new() -> Self {
+        Self {
+            nodes: vec![Node::default()],
+            routes: Vec::new(),
+            static_routes: HashMap::new(),
+            custom_params: Vec::new(),
+            max_params: 0,
+        }
+    }
+
+    fn insert(&mut self, spec: RouteSpec) {
+        let methods = spec.entry.methods;
+
+        self.max_params = self.max_params.max(spec.entry.keys.len());
+        self.routes.push(Arc::new(spec.entry));
+        let route = self.routes.len() - 1;
+
+        match spec.key {
+            RouteKey::Static(path) => self.static_routes.entry(path).or_default().insert(route, methods),
+            RouteKey::Param(parts) => self.insert_param_route(parts, route, methods),
+        }
+    }
+
+    fn param_kind(&mut self, spec: ParamSpec) -> ParamKind {
+        match spec {
+            ParamSpec::Kind(kind) => kind,
+            // another route may have added the same type since the declaration was read
+            ParamSpec::New(param) => match self.custom_params.iter().position(|p| p.name == param.name) {
+                Some(i) => ParamKind::Custom(i),
+                None => {
+                    self.custom_params.push(Arc::new(param));
+                    ParamKind::Custom(self.custom_params.len() - 1)
+                }
+            },
+        }
+    }
+
+    fn priority(&self, kind: ParamKind) -> f64 {
+        match kind {
+            ParamKind::Custom(i) => self.custom_params[i].priority,
+            _ => kind.priority(),
+        }
+    }
+
+    // custom scanners are python callables, so only they take the GIL, lookups may run without it,
+    // an exception raised by a scanner fails the lookup, same as in the python table
+    fn matches(&self, kind: ParamKind, value: &str) -> PyResult<bool> {
+        match kind {
+            ParamKind::Custom(i) => {
+                Python::with_gil(|py| self.custom_params[i].scanner.bind(py).call1((value,))?.is_truthy())
+            }
+            _ => Ok(kind.matches(value)),
+        }
+    }
+
+    fn insert_param_route(&mut self, parts: Vec<PartSpec>, route: usize, methods: Methods) {
+        let mut node = 0;
+
+        for part in parts {
+            self.nodes[node].mask |= methods;
+
+            node = match part {
+                PartSpec::Static(path) => {
+                    let existing = self.nodes[node].statics.get(&path).copied();
+
+                    match existing {
+                        Some(child) => child,
+                        None => {
+                            let child = self.new_node();
+                            self.nodes[node].statics.insert(path, child);
+                            child
+                        }
+                    }
+                }
+                PartSpec::Param(spec) => {
+                    let kind = self.param_kind(spec);
+
+                    if kind == ParamKind::Path {
+                        let existing = self.nodes[node].tail;
+
+                        let child = match existing {
+                            Some(child) => child,
+                            None => self.new_node(),
+                        };
+
+                        self.nodes[node].tail = Some(child);
+                        node = child;
+                        continue;
+                    }
+
+                    let existing = self.nodes[node].params.iter().find(|(k, _)| *k == kind).map(|&(_, child)| child);
+
+                    match existing {
+                        Some(child) => child,
+                        None => {
+                            // params are kept in priority order, so routes can be added after prepare()
+                            let child = self.new_node();
+                            let priority = self.priority(kind);
+                            let at = self.nodes[node]
+                                .params
+                                .iter()
+                                .take_while(|&&(k, _)| self.priority(k) <= priority)
+                                .count();
+                            self.nodes[node].params.insert(at, (kind, child));
+                            child
+                        }
+                    }
+                }
+                PartSpec::Pattern(prefix, suffix, spec) => {
+                    let kind = self.param_kind(spec);
+
+                    let existing = self.nodes[node]
+                        .patterns
+                        .iter()
+                        .find(|(p, s, k, _)| *p == prefix && *s == suffix && *k == kind)
+                        .map(|&(_, _, _, child)| child);
+
+                    match existing {
+                        Some(child) => child,
+                        None => {
+                            // longer prefix, then longer suffix, then params priority, same as in _compiled.py
+                            let child = self.new_node();
+                            let priority = self.priority(kind);
+                            let at = self.nodes[node]
+                                .patterns
+                                .iter()
+                                .take_while(|(p, s, k, _)| {
+                                    p.len() > prefix.len()
+                                        || (p.len() == prefix.len()
+                                            && (s.len() > suffix.len()
+                                                || (s.len() == suffix.len() && self.priority(*k) <= priority)))
+                                })
+                                .count();
+                            self.nodes[node].patterns.insert(at, (prefix, suffix, kind, child));
+                            child
+                        }
+                    }
+                }
+            };
+        }
+
+        self.nodes[node].mask |= methods;
+        self.nodes[node].leafs.insert(route, methods);
+    }
+
+    // position past the end of the path means that the whole path is consumed
+    fn start(path: &str) -> usize {
+        if path.is_empty() {
+            1
+        } else {
+            0
+        }
+    }
+
+    fn new_node(&mut self) -> usize {
+        self.nodes.push(Node::default());
+        self.nodes.len() - 1
+    }
+
+    // the dict is built once, only for the winning route
+    fn build_match(
+        &self,
+        py: Python<'_>,
+        route: usize,
+        path: &str,
+        captures: &[(usize, usize)],
+        convert: bool,
+    ) -> PyResult<(PyObject, Py<PyDict>)> {
+        let entry = &self.routes[route];
+        let params = PyDict::new(py);
+
+        for ((key, convertor), &(start, end)) in entry.keys.iter().zip(&entry.convertors).zip(captures) {
+            let value = &path[start..end];
+
+            if convert {
+                params.set_item(key.bind(py), convertor.call_method1(py, "convert", (value,))?)?;
+            } else {
+                params.set_item(key.bind(py), value)?;
+            }
+        }
+
+        Ok((entry.route.clone_ref(py), params.unbind()))
+    }
+
+    // the matched route and spans of its params in the path
+    fn match_route(&self, index: usize, path: &str) -> PyResult<Option<(usize, Vec<(usize, usize)>)>> {
+        if let Some(route) = self.static_routes.get(path).and_then(|leafs| leafs.routes[index]) {
+            return Ok(Some((route, Vec::new())));
+        }
+
+        let mut captures = Vec::with_capacity(self.max_params);
+        let Some(node) = self.find(0, path, Self::start(path), 1 << index, &mut captures)? else {
+            return Ok(None);
+        };
+
+        Ok(self.nodes[node].leafs.routes[index].map(|route| (route, captures)))
+    }
+
+    fn find(
+        &self,
+        node: usize,
+        path: &str,
+        start: usize,
+        method: Methods,
+        captures: &mut Vec<(usize, usize)>,
+    ) -> PyResult<Option<usize>> {
+        if self.nodes[node].mask & method == 0 {
+            return Ok(None);
+        }
+
+        if start > path.len() {
+            if self.nodes[node].leafs.mask & method != 0 {
+                return Ok(Some(node));
+            }
+
+            // an empty tail still matches, like the ".*" regex of starlette path convertor
+            return self.find_tail(node, path, path.len(), method, captures);
+        }
+
+        let end = path[start..].find('/').map_or(path.len(), |i| start + i);
+        let segment = &path[start..end];
+        let node_idx = node;
+        let node = &self.nodes[node];
+
+        if let Some(&child) = node.statics.get(segment) {
+            if let Some(found) = self.find(child, path, end + 1, method, captures)? {
+                return Ok(Some(found));
+            }
+        }
+
+        for (prefix, suffix, kind, child) in &node.patterns {
+            // the captured value can't be empty
+            if segment.len() <= prefix.len() + suffix.len()
+                || !segment.starts_with(prefix.as_str())
+                || !segment.ends_with(suffix.as_str())
+            {
+                continue;
+            }
+
+            let value = (start + prefix.len(), end - suffix.len());
+
+            if !self.matches(*kind, &path[value.0..value.1])? {
+                continue;
+            }
+
+            captures.push(value);
+
+            if let Some(found) = self.find(*child, path, end + 1, method, captures)? {
+                return Ok(Some(found));
+            }
+
+            captures.pop();
+        }
+
+        for &(kind, child) in &node.params {
+            if !self.matches(kind, segment)? {
+                continue;
+            }
+
+            captures.push((start, end));
+
+            if let Some(found) = self.find(child, path, end + 1, method, captures)? {
+                return Ok(Some(found));
+            }
+
+            captures.pop();
+        }
+
+        self.find_tail(node_idx, path, start, method, captures)
+    }
+
+    fn find_tail(
+        &self,
+        node: usize,
+        path: &str,
+        start: usize,
+        method: Methods,
+        captures: &mut Vec<(usize, usize)>,
+    ) -> PyResult<Option<usize>> {
+        let Some(child) = self.nodes[node].tail else {
+            return Ok(None);
+        };
+        captures.push((start, path.len()));
+
+        let found = self.find(child, path, path.len() + 1, method, captures)?;
+        if found.is_none() {
+            captures.pop();
+        }
+
+        Ok(found)
+    }
+}
+
+#[pyclass(frozen, module = "fastapi_radixer._fastapi_radixer")]
+struct RoutingTable {
+    // lookups match against the table they loaded, even with the GIL released, add_route changes the table in place
+    // or, while lookups still use it, a copy that is swapped in, so a lookup never sees a half added route
+    table: RwLock<Arc<Table>>,
+    // when disabled, params are returned as raw strings, e.g. for FastAPI routes that validate them anyway
+    #[pyo3(get)]
+    convert_params: bool,
+    // match single lookups with the GIL released, lets other threads run during long matches,
+    // but reacquiring a contended GIL can cost more than a short match on GIL builds
+    #[pyo3(get)]
+    release_gil: bool,
+}
+
+impl RoutingTable {
+    // the lock is only held to clone the pointer, never while matching or calling python
+    fn table(&self) -> Arc<Table> {
+        Arc::clone(&*self.table.read().unwrap_or_else(PoisonError::into_inner))
+    }
+}
+
+#[pymethods]
+impl RoutingTable {
+    #[new]
+    #[pyo3(signature = (*, convert_params = true, release_gil = false))]
+    fn new(convert_params: bool, release_gil: bool) -> Self {
+        Self {
+            table: RwLock::new(Arc::new(Table::new())),
+            convert_params,
+            release_gil,
+        }
+    }
+
+    fn add_route(&self, py: Python<'_>, route: &Bound<'_, PyAny>) -> PyResult<()> {
+        // python is called before the lock is taken, so the insertion can't wait for the GIL held by a lookup
+        let spec = RouteSpec::read(py, route, &self.table())?;
+        let mut table = self.table.write().unwrap_or_else(PoisonError::into_inner);
+
+        Arc::make_mut(&mut *table).insert(spec);
+        Ok(())
+    }
+
+    // the table is always ready for lookups, params are sorted on insertion
+    fn prepare(&self) {}
+
+    // a new empty table with the same settings, used for rebuilds and mounted apps
+    fn empty_copy(&self) -> Self {
+        Self::new(self.convert_params, self.release_gil)
+    }
+
+    fn lookup(&self, py: Python<'_>, method: &str, path: &str) -> PyResult<Option<(PyObject, Py<PyDict>)>> {
+        let Some(index) = method_index(method) else {
+            return Ok(None);
+        };
+
+        let table = self.table();
+
+        // the path is a borrowed utf-8 view of the python string, only custom scanners take the GIL back
+        let res = if self.release_gil {
+            py.allow_threads(|| table.match_route(index, path))
+        } else {
+            table.match_route(index, path)
+        };
+
+        match res? {
+            Some((route, captures)) => table.build_match(py, route, path, &captures, self.convert_params).map(Some),
+            None => Ok(None),
+        }
+    }
+
+    // params are returned as raw strings, pairs are matched with the GIL released, optionally on several threads
+    #[pyo3(signature = (pairs, threads = 1))]
+    fn lookup_many(
+        &self,
+        py: Python<'_>,
+        pairs: &Bound<'_, PyAny>,
+        threads: usize,
+    ) -> PyResult<Vec<Option<(PyObject, Py<PyDict>)>>> {
+        let mut requests = Vec::new();
+
+        for pair in pairs.try_iter()? {
+            let (method, path): (String, String) = pair?.extract()?;
+            requests.push((method_index(&method), path));
+        }
+
+        let table = self.table();
+        let table = table.as_ref();
+
+        let matches = py.allow_threads(|| {
+            let match_all = |requests: &[(Option<usize>, String)]| {
+                requests
+                    .iter()
+                    .map(|(index, path)| match index {
+                        Some(index) => table.match_route(index, path),
+                        None => Ok(None),
+                    })
+                    .collect::<Vec<_>>()
+            };
+
+            if threads <= 1 || requests.len() < threads {
+                return match_all(&requests);
+            }
+
+            std::thread::scope(|scope| {
+                let handles: Vec<_> = requests
+                    .chunks(requests.len().div_ceil(threads))
+                    .map(|chunk| scope.spawn(move || match_all(chunk)))
+                    .collect();
+
+                handles
+                    .into_iter()
+                    .flat_map(|handle| handle.join().expect("lookup thread panicked"))
+                    .collect()
+            })
+        });
+
+        requests
+            .iter()
+            .zip(matches)
+            .map(|((_, path), res)| match res? {
+                Some((route, captures)) => table.build_match(py, route, path, &captures, false).map(Some),
+                None => Ok(None),
+            })
+            .collect()
+    }
+
+    fn allowed_methods(&self, path: &str) -> PyResult<HashSet<&'static str>> {
+        let table = self.table();
+        let mut methods = table.static_routes.get(path).map(Leafs::methods).unwrap_or_default();
+        let mut captures = Vec::with_capacity(table.max_params);
+
+        if let Some(node) = table.find(0, path, Table::start(path), ALL_METHODS, &mut captures)? {
+            methods.extend(table.nodes[node].leafs.methods());
+        }
+
+        Ok(methods)
+    }
+}
 
-#[pymodule]
+// lookups only read a version of the table that is never changed, so it's safe without the GIL
+#[pymodule(gil_used = false)]
 fn _fastapi_radixer(m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<RoutingTable>()?;
     Ok(())
 }
@@ -3,7 +3,7 @@ import pytest_asyncio
 from fastapi import FastAPI
 from httpx import AsyncClient, ASGITransport
 
-from fastapi_radixer import Radixer, init_app
+from fastapi_radixer import NativeRoutingTable, Radixer, RadixerRoutingTable, RoutingTable, init_app
 
 
 @pytest.fixture
@@ -11,9 +11,20 @@ def app() -> FastAPI:
     return FastAPI()
 
 
+@pytest.fixture(params=["python", "native"])
+def routing_table(request) -> RadixerRoutingTable:
+    if request.param == "native":
+        if NativeRoutingTable is None:
+            pytest.skip("native extension is not built")
+
+        return NativeRoutingTable()
+
+    return RoutingTable()
+
+
 @pytest.fixture
-def radixer() -> Radixer:
-    return Radixer()
+def radixer(routing_table) -> Radixer:
+    return Radixer(routing_table=routing_table)
 
 
 @pytest.fixture
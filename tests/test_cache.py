@@ -0,0 +1,113 @@
+import pytest
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from fastapi_radixer import ClockCache, LRUCache, RoutingTable, create_cache
+from fastapi_radixer.parser import parse_route
+
+
+async def _endpoint(_):
+    return PlainTextResponse("ok")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.stats.hits, cache.stats.misses) == (3, 1)
+
+
+def test_clock_gives_second_chance():
+    cache = ClockCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize("policy", ["lru", "clock"])
+def test_create_cache(policy):
+    cache = create_cache(8, policy)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalid_cache_config():
+    with pytest.raises(ValueError, match="capacity"):
+        LRUCache(0)
+
+    with pytest.raises(ValueError, match="policy"):
+        create_cache(8, "fifo")
+
+
+@pytest.mark.parametrize("policy", ["lru", "clock"])
+def test_routing_table_cache(policy):
+    table = RoutingTable(cache=create_cache(8, policy))
+    first = Route("/items/{item_id}", _endpoint, methods=["GET"])
+    table.add_route(parse_route(first))
+    table.prepare()
+
+    assert table.lookup("GET", "items/1") == (first, {"item_id": "1"})
+    assert table.lookup("GET", "items/1") == (first, {"item_id": "1"})
+    assert (table.cache.stats.hits, table.cache.stats.misses) == (1, 1)
+
+    # adding a route invalidates cached results
+    second = Route("/items/{item_id:int}", _endpoint, methods=["GET"])
+    table.add_route(parse_route(second))
+    table.prepare()
+
+    assert len(table.cache) == 0
+    assert table.lookup("GET", "items/1") == (second, {"item_id": 1})
+
+
+def test_cached_params_are_not_shared():
+    table = RoutingTable(cache=create_cache(8))
+    route = Route("/items/{item_id}", _endpoint, methods=["GET"])
+    table.add_route(parse_route(route))
+    table.prepare()
+
+    # both the result that fills the cache and a cache hit can be changed by the caller
+    for _ in range(2):
+        _, params = table.lookup("GET", "items/1")
+        params["item_id"] = "changed"
+
+    assert table.lookup("GET", "items/1") == (route, {"item_id": "1"})
+    assert table.cache.stats.hits == 2
+
+
+def test_routing_table_negative_cache():
+    table = RoutingTable(negative_cache=create_cache(8))
+    table.add_route(parse_route(Route("/items/{item_id:int}", _endpoint, methods=["GET"])))
+    table.prepare()
+
+    assert table.lookup("GET", "items/x") is None
+    assert table.lookup("GET", "items/x") is None
+    assert (table.negative_cache.stats.hits, table.negative_cache.stats.misses) == (1, 1)
+
+    # adding a route invalidates cached misses
+    route = Route("/items/{slug}", _endpoint, methods=["GET"])
+    table.add_route(parse_route(route))
+
+    assert len(table.negative_cache) == 0
+    assert table.lookup("GET", "items/x") == (route, {"slug": "x"})
@@ -0,0 +1,60 @@
+import pytest
+from starlette.endpoints import HTTPEndpoint
+from starlette.responses import PlainTextResponse
+from starlette.routing import Host, Route
+
+from fastapi_radixer import Radixer
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _endpoint(_):
+    return PlainTextResponse("ok")
+
+
+class _Endpoint(HTTPEndpoint):
+    async def get(self, _):
+        return PlainTextResponse("ok")
+
+
+@pytest.fixture
+def routes():
+    return [
+        Route("/users/{user_id:int}", _endpoint),
+        Route("/files/{name}.{ext}", _endpoint),
+        Route("/files/{file_path:path}/raw", _endpoint),
+        Route("/items", _Endpoint),
+        Host("api-{tenant}.example.com", app=PlainTextResponse("ok")),
+    ]
+
+
+async def test_coverage_report(routes):
+    radixer = Radixer(routes=routes)
+    report = radixer.coverage_report()
+
+    assert report.indexed == routes[:1]
+    assert [reason for _, reason in report.fallback] == [
+        "several params in one segment",
+        "path param is not a whole last segment",
+        "route accepts any method",
+        "host pattern has partial labels, a port or path params",
+    ]
+    assert report.format().startswith("1 routes indexed, 4 routes fall back")
+
+
+async def test_strict_mode_refuses_to_start(routes):
+    radixer = Radixer(routes=routes, strict=True)
+
+    with pytest.raises(RuntimeError, match="strict mode"):
+        async with radixer.lifespan_context(radixer):
+            pass
+
+
+async def test_strict_mode_refuses_to_rebuild(routes):
+    radixer = Radixer(routes=routes[:1], strict=True)
+    radixer.prepare()
+
+    with pytest.raises(RuntimeError, match="several params in one segment"):
+        radixer.update_routes(add=routes[1:2])
+
+    assert radixer.routes == routes[:1]
@@ -0,0 +1,94 @@
+import pytest
+from fastapi import status
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from fastapi_radixer._fallback import FallbackRouter
+
+
+async def _endpoint(request):
+    return PlainTextResponse(request.url.path)
+
+
+def test_candidates_are_grouped_by_literal_prefix():
+    router = FallbackRouter()
+    routes = [
+        Route("/files/{name}.{ext}", _endpoint),
+        Route("/{a}-{b}", _endpoint),
+        Route("/images/{name}.{ext}", _endpoint),
+        Route("/files/{a}.{b}/raw", _endpoint),
+    ]
+
+    for route in routes:
+        router.add_route(route)
+
+    assert router.candidates("files/a.txt") == [routes[0], routes[1], routes[3]]
+    assert router.candidates("images/a.png") == [routes[1], routes[2]]
+    assert router.candidates("wp-admin") == [routes[1]]
+
+
+@pytest.fixture(autouse=True)
+def _init_routes(radixer_app, radixer):
+    radixer_app.router.add_route("/files/{name}.{ext}", _endpoint, methods=["GET"])
+    radixer_app.router.add_route("/files/{name}.{ext}/raw/", _endpoint, methods=["GET"])
+
+    @radixer_app.post("/files/{name}")
+    async def upload(name: str):
+        return {"name": name}
+
+
+@pytest.mark.asyncio
+async def test_fallback_route(radixer, client):
+    response = await client.get("/files/a.txt")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "/files/a.txt"
+
+    assert len(radixer.fallback_router) == 2
+
+
+@pytest.mark.asyncio
+async def test_fallback_redirect_slashes(client):
+    response = await client.get("/files/a.txt/raw")
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+    assert response.headers["location"] == "http://testserver/files/a.txt/raw/"
+
+
+@pytest.mark.asyncio
+async def test_method_not_allowed_with_fallback_routes(client):
+    response = await client.get("/files/readme")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    assert response.headers["allow"] == "POST"
+
+
+@pytest.mark.asyncio
+async def test_not_found_with_fallback_routes(client):
+    response = await client.get("/wp-admin/setup.php")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_non_standard_methods_fall_back(radixer_app, radixer, client):
+    radixer_app.router.add_route("/dav", _endpoint, methods=["PROPFIND"])
+    radixer_app.router.add_route("/dav/{name}", _endpoint, methods=["PROPFIND", "GET"])
+
+    for path in ("/dav", "/dav/notes"):
+        response = await client.request("PROPFIND", path)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == path
+
+    assert (await client.get("/dav/notes")).status_code == status.HTTP_200_OK
+    assert radixer.coverage_report().fallback[-1] == (radixer.routes[-1], "route has non-standard methods")
+
+
+@pytest.mark.asyncio
+async def test_routes_appended_to_the_list_directly(radixer_app, radixer, client):
+    radixer_app.router.routes.append(Route("/late/{name}.{ext}", _endpoint, methods=["GET"]))
+    radixer_app.router.routes.append(Route("/late/{name}", _endpoint, methods=["GET"]))
+
+    for path in ("/late/a.txt", "/late/readme"):
+        response = await client.get(path)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == path
+
+    assert radixer.indexed_routes == len(radixer.routes)
+    assert radixer.fallback_routes[-1] is radixer.routes[-2]
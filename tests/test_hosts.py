@@ -0,0 +1,132 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+from starlette.responses import PlainTextResponse
+from starlette.routing import Host, Route
+
+from fastapi_radixer import Radixer, init_app
+from fastapi_radixer._hosts import HostTable
+
+
+async def _endpoint(request):
+    return PlainTextResponse(str(request.path_params))
+
+
+def _host(host: str) -> Host:
+    return Host(host, app=PlainTextResponse("ok"))
+
+
+def test_host_table_lookup():
+    table = HostTable()
+    api = _host("api.example.com")
+    tenant = _host("{tenant}.example.com")
+    shard = _host("{shard:int}.db.example.com")
+
+    for position, host in enumerate((api, shard, tenant)):
+        assert table.add_host(host, position)
+
+    assert table.lookup("api.example.com") is api
+    assert table.lookup("acme.example.com") is tenant
+    assert table.lookup("1.db.example.com") is shard
+    assert table.lookup("example.com") is None
+    assert table.lookup("acme.example.org") is None
+
+    # str params match dotted values as well, like the "[^/]+" regex of starlette
+    assert table.lookup("x.db.example.com") is tenant
+    assert table.lookup("a.1.db.example.com") is tenant
+
+
+def test_host_table_first_registered_host_wins():
+    table = HostTable()
+    tenant = _host("{tenant}.example.com")
+    api = _host("api.example.com")
+    shard = _host("{shard:int}.{region}.example.com")
+
+    for position, host in enumerate((tenant, api, shard)):
+        assert table.add_host(host, position)
+
+    assert table.lookup("api.example.com") is tenant
+    assert table.lookup("1.eu.example.com") is tenant
+
+
+def test_host_table_skips_partial_labels():
+    table = HostTable()
+
+    assert not table.add_host(_host("api-{tenant}.example.com"), 0)
+    assert len(table) == 0
+
+
+@pytest.fixture(autouse=True)
+def _init_routes(radixer_app, radixer):
+    radixer.fallback = False
+
+    admin_app = FastAPI()
+
+    @admin_app.get("/status")
+    async def admin_status():
+        return {"admin": True}
+
+    radixer_app.host("admin.example.com", admin_app)
+    radixer_app.host("{tenant}.example.com", Radixer(routes=[Route("/users/{user_id:int}", _endpoint)]))
+
+    @radixer_app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_exact_host(client):
+    response = await client.get("/status", headers={"host": "admin.example.com:8000"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"admin": True}
+
+
+@pytest.mark.asyncio
+async def test_host_params_are_merged_into_path_params(client):
+    response = await client.get("/users/1", headers={"host": "acme.example.com"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "{'tenant': 'acme', 'user_id': 1}"
+
+
+@pytest.mark.asyncio
+async def test_unknown_host_uses_path_routes(radixer, client):
+    response = await client.get("/health", headers={"host": "example.org"})
+    assert response.status_code == status.HTTP_200_OK
+
+    assert radixer.fallback_routes == []
+    assert len(radixer.host_table) == 2
+
+
+@pytest.mark.asyncio
+async def test_dotted_host_param(client):
+    response = await client.get("/users/1", headers={"host": "a.b.example.com"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "{'tenant': 'a.b', 'user_id': 1}"
+
+
+@pytest.mark.asyncio
+async def test_routes_registered_before_host_win(routing_table, client):
+    app = FastAPI()
+    radixer = Radixer(routing_table=type(routing_table)())
+    init_app(app, radixer)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    app.router.add_route("/files/{name}.{ext}", _endpoint, methods=["GET"])
+    app.host("{tenant}.example.com", PlainTextResponse("tenant"))
+
+    @app.get("/users/{user_id}")
+    async def get_user(user_id: int):
+        return {"user_id": user_id}
+
+    headers = {"host": "acme.example.com"}
+
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://testserver") as tenant_client:
+        # indexed and fallback routes registered before the host are matched first, the later ones are shadowed
+        assert (await tenant_client.get("/health", headers=headers)).json() == {"status": "ok"}
+        assert (await tenant_client.get("/files/a.txt", headers=headers)).text == "{'name': 'a', 'ext': 'txt'}"
+        assert (await tenant_client.get("/users/1", headers=headers)).text == "tenant"
+        assert (await tenant_client.post("/health", headers=headers)).text == "tenant"
+        assert (await tenant_client.get("/users/1")).json() == {"user_id": 1}
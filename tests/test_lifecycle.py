@@ -0,0 +1,67 @@
+from dataclasses import replace
+
+import pytest
+from fastapi import status
+
+pytestmark = pytest.mark.asyncio
+
+
+class _CountingTable:
+    def __init__(self, table, prepare):
+        self._table = table
+        self.prepare = prepare
+
+    def __getattr__(self, name):
+        return getattr(self._table, name)
+
+
+@pytest.fixture
+def prepare_calls(radixer, monkeypatch):
+    calls = []
+    prepare = radixer.routing_table.prepare
+
+    def _prepare():
+        calls.append(True)
+        prepare()
+
+    routing_table = _CountingTable(radixer.routing_table, _prepare)
+    monkeypatch.setattr(radixer, "state", replace(radixer.state, routing_table=routing_table))
+    return calls
+
+
+async def test_prepared_once_on_first_request(radixer_app, prepare_calls, client):
+    @radixer_app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    for _ in range(3):
+        response = await client.get("/items/1")
+        assert response.status_code == status.HTTP_200_OK
+
+    assert prepare_calls == [True]
+
+
+async def test_prepared_on_startup(radixer_app, radixer, prepare_calls):
+    async with radixer_app.router.lifespan_context(radixer_app):
+        assert prepare_calls == [True]
+
+    assert radixer.state.lookup == radixer.routing_table.lookup
+
+
+async def test_routes_added_after_first_request(radixer_app, radixer, client):
+    radixer.fallback = False
+
+    @radixer_app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    response = await client.get("/items/1")
+    assert response.json() == {"item_id": 1}
+
+    @radixer_app.get("/items/{item_id}/tags/{tag}")
+    async def get_item_tag(item_id: int, tag: str):
+        return {"item_id": item_id, "tag": tag}
+
+    response = await client.get("/items/1/tags/new")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"item_id": 1, "tag": "new"}
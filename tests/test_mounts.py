@@ -0,0 +1,122 @@
+import pytest
+from fastapi import FastAPI, WebSocket, status
+from fastapi.staticfiles import StaticFiles
+from starlette.endpoints import HTTPEndpoint
+from starlette.routing import Mount, Route
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from fastapi_radixer import Radixer
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _endpoint(request):
+    return PlainTextResponse(f"{request.scope['root_path']} {request.path_params}")
+
+
+@pytest.fixture(autouse=True)
+def _init_routes(radixer_app, radixer, tmp_path):
+    radixer.fallback = False
+
+    sub_app = FastAPI()
+
+    @sub_app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    (tmp_path / "hello.txt").write_text("hello")
+
+    radixer_app.mount("/sub", sub_app)
+    radixer_app.mount("/static", StaticFiles(directory=tmp_path))
+    radixer.routes.append(Mount("/tenants/{tenant}", routes=[Route("/users/{user_id:int}", _endpoint)]))
+    radixer.try_add_route(radixer.routes[-1])
+
+    @radixer_app.websocket("/ws/{room}")
+    async def chat(websocket: WebSocket, room: str):
+        await websocket.accept()
+        await websocket.send_text(room)
+        await websocket.close()
+
+
+async def test_mounted_app(radixer_app, client):
+    response = await client.get("/sub/items/1")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"item_id": 1}
+
+    assert isinstance(radixer_app.routes[-4].app.router, Radixer)
+
+
+async def test_mounted_static_files(client):
+    response = await client.get("/static/hello.txt")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "hello"
+
+
+async def test_mounted_router_params(radixer_app, client):
+    response = await client.get("/tenants/acme/users/1")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "/tenants/acme {'tenant': 'acme', 'user_id': 1}"
+
+    assert isinstance(radixer_app.routes[-2].app, Radixer)
+
+
+async def test_mount_path_without_trailing_slash(client):
+    response = await client.get("/sub")
+    assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+    assert response.headers["location"] == "http://testserver/sub/"
+
+
+async def test_websocket_route(radixer_app):
+    with TestClient(radixer_app) as test_client, test_client.websocket_connect("/ws/lobby") as websocket:
+        assert websocket.receive_text() == "lobby"
+
+
+async def test_websocket_route_is_not_http(client):
+    response = await client.get("/ws/lobby")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_mount_accepts_any_method(radixer_app, client):
+    radixer_app.mount("/echo", PlainTextResponse("echo"))
+
+    for method in ("TRACE", "PROPFIND", "GET"):
+        response = await client.request(method, "/echo/abc")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == "echo"
+
+    response = await client.request("TRACE", "/sub/items/1")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    assert response.headers["allow"] == "GET"
+
+
+class _ClassEndpoint(HTTPEndpoint):
+    async def get(self, request):
+        return PlainTextResponse("cls")
+
+
+async def test_root_mount_keeps_routes_registered_before_it(radixer_app, radixer, client, tmp_path):
+    radixer.fallback = True
+    radixer_app.add_route("/cls", _ClassEndpoint)
+
+    @radixer_app.get("/files/{name}.{ext}")
+    async def get_file(name: str, ext: str):
+        return {"name": name, "ext": ext}
+
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "index.html").write_text("index")
+    radixer_app.mount("/", StaticFiles(directory=site, html=True))
+
+    # not indexed routes registered before the mount win, same as in starlette
+    response = await client.get("/cls")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "cls"
+
+    response = await client.get("/files/x.y")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"name": "x", "ext": "y"}
+
+    response = await client.get("/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "index"
@@ -0,0 +1,44 @@
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from fastapi_radixer import Radixer, RoutingTable, default_routing_table, lookup_stream
+from fastapi_radixer._base import allowed_methods
+
+
+def test_default_routing_table():
+    assert isinstance(default_routing_table(), RoutingTable)
+    assert isinstance(Radixer().routing_table, RoutingTable)
+
+
+async def _endpoint(_):
+    return PlainTextResponse("ok")
+
+
+class _MinimalTable:
+    # a third-party table with the methods of the first protocol version only
+    def __init__(self):
+        self._table = RoutingTable()
+
+    def add_route(self, route):
+        self._table.add_route(route)
+
+    def lookup(self, method, path):
+        return self._table.lookup(method, path)
+
+    def prepare(self):
+        self._table.prepare()
+
+
+def test_minimal_routing_table():
+    radixer = Radixer(routes=[Route("/items/{item_id:int}", _endpoint, methods=["GET"])], routing_table=_MinimalTable())
+    radixer.prepare()
+
+    assert radixer.lookup("GET", "items/1") == (radixer.routes[0], {"item_id": 1})
+    assert allowed_methods(radixer.routing_table, "items/1") == set()
+    assert list(lookup_stream(radixer.routing_table, [("GET", "items/1")])) == [(radixer.routes[0], {"item_id": 1})]
+
+    # rebuilt tables are created by the table class
+    radixer.update_routes(add=[Route("/users", _endpoint, methods=["GET"])])
+
+    assert isinstance(radixer.routing_table, _MinimalTable)
+    assert radixer.lookup("GET", "users") == (radixer.routes[1], {})
@@ -0,0 +1,44 @@
+import re
+import uuid
+
+import pytest
+from starlette.convertors import CONVERTOR_TYPES
+
+from fastapi_radixer.parser import parse_param_part, scan_param_part
+
+_VALUES = [
+    "",
+    "0",
+    "123",
+    "-1",
+    "+1",
+    " 1",
+    "1_000",
+    "١٢",
+    "1.5",
+    "1.",
+    ".5",
+    "1e5",
+    "inf",
+    "nan",
+    "slug",
+    "a/b",
+    str(uuid.UUID(int=1)),
+    str(uuid.UUID(int=1)).upper(),
+    uuid.UUID(int=1).hex,
+    str(uuid.UUID(int=1)).replace("-", "", 2),
+    "00000000-0000-0000-0000-0000000000001",
+    "-0000000-0000-0000-0000-000000000000",
+    f"{{{uuid.UUID(int=1)}}}",
+    "00000000-0000-0000-0000-00000000000g",
+]
+
+
+@pytest.mark.parametrize("param_type", ["int", "float", "uuid", "str"])
+@pytest.mark.parametrize("value", _VALUES)
+def test_scanners_match_starlette_convertors(param_type, value):
+    convertor = CONVERTOR_TYPES[param_type]
+    expected = re.fullmatch(convertor.regex, value) is not None
+
+    assert scan_param_part(param_type, value) is expected
+    assert parse_param_part(param_type, value) == ((True, convertor.convert(value)) if expected else (False, None))
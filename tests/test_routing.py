@@ -38,6 +38,10 @@ def _init_routes(radixer_app):
     async def get_category(name: str):
         return {"category": name}
 
+    @radixer_app.get("/static/{file_path:path}")
+    async def get_static(file_path: str):
+        return {"file_path": file_path}
+
     @radixer_app.get("/")
     async def root():
         return {"message": "root"}
@@ -100,6 +104,30 @@ async def test_http_method_matching(client):
     # Wrong method should fail
     response = await client.post("/health")
     assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    assert response.headers["allow"] == "GET"
+
+    response = await client.delete("/users/123")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    assert response.headers["allow"] == "GET"
+
+
+async def test_method_not_allowed_without_fallback(radixer, client):
+    radixer.fallback = False
+
+    response = await client.put("/users/123/posts/789")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    assert response.headers["allow"] == "GET"
+
+    response = await client.put("/users/123/comments")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_path_parameter(radixer, client):
+    radixer.fallback = False
+
+    response = await client.get("/static/css/site/main.css")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"file_path": "css/site/main.css"}
 
 
 async def test_root_route(client):
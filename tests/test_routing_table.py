@@ -0,0 +1,345 @@
+import datetime
+
+import pytest
+from starlette.convertors import CONVERTOR_TYPES, Convertor
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from fastapi_radixer import (
+    NativeRoutingTable,
+    RoutingTable,
+    lookup_stream,
+    register_param_type,
+    unregister_param_type,
+)
+from fastapi_radixer._routing_table import RoutingTrie
+from fastapi_radixer.parser import convertor_to_param_type, parse_route
+
+
+async def _endpoint(_):
+    return PlainTextResponse("ok")
+
+
+class _DateConvertor(Convertor[datetime.date]):
+    regex = "[0-9]{4}-[0-9]{2}-[0-9]{2}"
+
+    def convert(self, value: str) -> datetime.date:
+        return datetime.date.fromisoformat(value)
+
+    def to_string(self, value: datetime.date) -> str:
+        return value.isoformat()
+
+
+@pytest.fixture
+def date_param_type():
+    convertor = _DateConvertor()
+    register_param_type("date", convertor, charset="0123456789-")
+
+    yield convertor
+
+    unregister_param_type("date")
+
+
+@pytest.fixture
+def add_route(routing_table):
+    def _add_route(path: str, methods: tuple[str, ...] = ("GET",)) -> Route:
+        route = Route(path, _endpoint, methods=list(methods))
+        routing_table.add_route(parse_route(route))
+
+        return route
+
+    return _add_route
+
+
+def test_backtracking_between_param_types(routing_table, add_route):
+    int_route = add_route("/items/{item_id:int}/details")
+    str_route = add_route("/items/{slug}/reviews")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "items/1/details") == (int_route, {"item_id": 1})
+    assert routing_table.lookup("GET", "items/1/reviews") == (str_route, {"slug": "1"})
+
+
+def test_radix_chain_matches_whole_segments(routing_table, add_route):
+    route = add_route("/api/v1/items/{item_id:int}")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "api/v1/items/7") == (route, {"item_id": 7})
+    assert routing_table.lookup("GET", "api/v1/itemsx/7") is None
+    assert routing_table.lookup("GET", "api/v1/item/7") is None
+
+
+def test_method_mismatch(routing_table, add_route):
+    route = add_route("/items/{item_id:int}", methods=("POST",))
+    routing_table.prepare()
+
+    assert routing_table.lookup("POST", "items/1") == (route, {"item_id": 1})
+    assert routing_table.lookup("GET", "items/1") is None
+
+
+def test_unsupported_methods_are_rejected(routing_table):
+    # both engines refuse a method they can't index instead of dropping it, the parser leaves such routes
+    # to the fallback router
+    route = Route("/dav/{name}", _endpoint, methods=["GET"])
+    decl = parse_route(route)
+    decl["methods"] = {"GET", "PROPFIND"}
+
+    with pytest.raises(ValueError, match="PROPFIND"):
+        routing_table.add_route(decl)
+
+    assert parse_route(Route("/dav/{name}", _endpoint, methods=["PROPFIND"])) is None
+
+
+def test_routes_added_after_prepare():
+    table = RoutingTable()
+    table.prepare()
+
+    route = Route("/items/{item_id:int}", _endpoint, methods=["GET"])
+    table.add_route(parse_route(route))
+    table.prepare()
+
+    assert table.lookup("GET", "items/1") == (route, {"item_id": 1})
+
+
+def test_params_after_backtracking(routing_table, add_route):
+    int_route = add_route("/a/{x:int}/{y:int}/b")
+    str_route = add_route("/a/{name}/{value}/c")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "a/1/2/b") == (int_route, {"x": 1, "y": 2})
+    assert routing_table.lookup("GET", "a/1/2/c") == (str_route, {"name": "1", "value": "2"})
+
+
+def test_method_indexed_leafs(routing_table, add_route):
+    get_route = add_route("/items/{item_id:int}", methods=("GET",))
+    post_route = add_route("/items/{item_id:int}", methods=("POST",))
+    add_route("/items", methods=("PUT",))
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "items/1") == (get_route, {"item_id": 1})
+    assert routing_table.lookup("POST", "items/1") == (post_route, {"item_id": 1})
+    assert routing_table.lookup("DELETE", "items/1") is None
+
+    assert routing_table.allowed_methods("items/1") == {"GET", "HEAD", "POST"}
+    assert routing_table.allowed_methods("items") == {"PUT"}
+    assert routing_table.allowed_methods("items/x") == set()
+
+
+def test_first_registered_route_wins(routing_table, add_route):
+    first = add_route("/items/{item_id:int}")
+    add_route("/items/{other_id:int}")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "items/1") == (first, {"item_id": 1})
+
+
+def test_path_tail_capture(routing_table, add_route):
+    file_route = add_route("/files/{file_path:path}")
+    readme_route = add_route("/files/README")
+    raw_route = add_route("/files/{name}/raw")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "files/a/b/c.txt") == (file_route, {"file_path": "a/b/c.txt"})
+    assert routing_table.lookup("GET", "files/a.txt") == (file_route, {"file_path": "a.txt"})
+    assert routing_table.lookup("GET", "files") == (file_route, {"file_path": ""})
+    assert routing_table.lookup("GET", "files/README") == (readme_route, {})
+    assert routing_table.lookup("GET", "files/a/raw") == (raw_route, {"name": "a"})
+
+
+def test_path_tail_after_params(routing_table, add_route):
+    route = add_route("/repos/{repo_id:int}/{ref}/{file_path:path}")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "repos/1/main/src/app.py") == (
+        route,
+        {"repo_id": 1, "ref": "main", "file_path": "src/app.py"},
+    )
+    assert routing_table.lookup("GET", "repos/x/main/src/app.py") is None
+
+
+def test_path_param_in_the_middle_is_not_indexed():
+    route = Route("/files/{file_path:path}/raw", _endpoint)
+
+    assert parse_route(route) is None
+
+
+def test_params_with_prefix_and_suffix(routing_table, add_route):
+    json_route = add_route("/files/{name}.json")
+    tar_route = add_route("/files/{name}.tar.gz")
+    version_route = add_route("/v{version:int}/items")
+    avatar_route = add_route("/users/avatar-{user_id:int}")
+    user_route = add_route("/users/{username}")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "files/data.json") == (json_route, {"name": "data"})
+    assert routing_table.lookup("GET", "files/backup.tar.gz") == (tar_route, {"name": "backup"})
+    assert routing_table.lookup("GET", "files/.json") is None
+    assert routing_table.lookup("GET", "v2/items") == (version_route, {"version": 2})
+    assert routing_table.lookup("GET", "vx/items") is None
+    assert routing_table.lookup("GET", "users/avatar-7") == (avatar_route, {"user_id": 7})
+    assert routing_table.lookup("GET", "users/avatar-x") == (user_route, {"username": "avatar-x"})
+
+
+def test_several_params_in_one_segment_are_not_indexed():
+    route = Route("/files/{name}.{ext}", _endpoint)
+
+    assert parse_route(route) is None
+
+
+@pytest.mark.parametrize("table_cls", [RoutingTable, NativeRoutingTable])
+def test_raw_params(table_cls):
+    if table_cls is None:
+        pytest.skip("native extension is not built")
+
+    routing_table = table_cls(convert_params=False)
+    route = Route("/items/{item_id:int}/{price:float}", _endpoint)
+    routing_table.add_route(parse_route(route))
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "items/1/2.5") == (route, {"item_id": "1", "price": "2.5"})
+
+
+def test_params_are_converted_only_for_matched_route(routing_table, add_route, monkeypatch):
+    uuid_route = add_route("/items/{item_id:uuid}/details")
+    int_route = add_route("/items/{item_id:int}/reviews")
+    add_route("/items/{slug}/tags")
+
+    calls = []
+    for route in (uuid_route, int_route):
+        convertor = route.param_convertors["item_id"]
+        monkeypatch.setattr(convertor, "convert", lambda value, convert=convertor.convert: calls.append(value) or convert(value))
+
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "items/7/tags")[1] == {"slug": "7"}
+    assert calls == []
+
+    assert routing_table.lookup("GET", "items/7/reviews") == (int_route, {"item_id": 7})
+    assert calls == ["7"]
+
+
+@pytest.mark.usefixtures("date_param_type")
+def test_custom_param_type(routing_table, add_route):
+    slug_route = add_route("/events/{slug}")
+    date_route = add_route("/events/{day:date}")
+    routing_table.prepare()
+
+    assert routing_table.lookup("GET", "events/2024-01-31") == (date_route, {"day": datetime.date(2024, 1, 31)})
+    assert routing_table.lookup("GET", "events/2024-01") == (slug_route, {"slug": "2024-01"})
+    assert routing_table.lookup("GET", "events/launch") == (slug_route, {"slug": "launch"})
+
+
+def _raising_validator(value: str) -> bool:
+    msg = f"broken validator: {value}"
+    raise RuntimeError(msg)
+
+
+@pytest.fixture
+def broken_param_type():
+    register_param_type("broken", _DateConvertor(), validator=_raising_validator)
+
+    yield
+
+    unregister_param_type("broken")
+
+
+def _check_raising_validator(routing_table):
+    routing_table.add_route(parse_route(Route("/events/{day:broken}", _endpoint)))
+    routing_table.prepare()
+
+    # a buggy validator is not turned into a miss
+    with pytest.raises(RuntimeError, match="broken validator: today"):
+        routing_table.lookup("GET", "events/today")
+
+
+@pytest.mark.usefixtures("broken_param_type")
+def test_raising_validator_fails_the_lookup(routing_table):
+    _check_raising_validator(routing_table)
+
+
+@pytest.mark.usefixtures("broken_param_type")
+@pytest.mark.skipif(NativeRoutingTable is None, reason="native extension is not built")
+def test_raising_validator_fails_the_native_lookup_without_gil():
+    _check_raising_validator(NativeRoutingTable(release_gil=True))
+
+
+def test_unregister_param_type(date_param_type):
+    unregister_param_type("date")
+
+    assert convertor_to_param_type(date_param_type) is None
+    assert "date" not in CONVERTOR_TYPES
+
+    with pytest.raises(ValueError, match="not registered"):
+        unregister_param_type("int")
+
+    # registered back, so the fixture can clean up
+    register_param_type("date", date_param_type)
+
+
+def test_first_segment_filter():
+    routing_table = RoutingTable()
+    route = Route("/api/v1/items/{item_id:int}", _endpoint)
+    routing_table.add_route(parse_route(route))
+    routing_table.add_route(parse_route(Route("/users/{user_id:int}", _endpoint)))
+    routing_table.prepare()
+
+    assert routing_table.compiled.first_segments == {"api", "users"}
+    assert routing_table.lookup("GET", "api/v1/items/1") == (route, {"item_id": 1})
+    assert routing_table.lookup("GET", "wp-admin/setup.php") is None
+    assert routing_table.allowed_methods("wp-admin/setup.php") == set()
+
+    routing_table.add_route(parse_route(Route("/{slug}/items", _endpoint)))
+
+    assert routing_table.compiled.first_segments is None
+
+
+def test_empty_nodes_share_containers():
+    table = RoutingTable()
+    routes = [
+        Route("/items/{item_id:int}", _endpoint, methods=["GET"]),
+        Route("/items/{item_id:int}/files/{name}.json", _endpoint, methods=["POST"]),
+        Route("/items/{item_id:int}/{rest:path}", _endpoint, methods=["GET"]),
+    ]
+    for route in routes:
+        table.add_route(parse_route(route))
+    table.prepare()
+
+    leaf = table.route_trie.static_parts["items"].param_parts["int"]
+    assert leaf.leafs[0].params == ("item_id",)
+    assert leaf.leafs[0].route is routes[0]
+
+    # shared empties are replaced, never filled in place
+    empty = RoutingTrie()
+    assert empty.static_parts is leaf.static_parts["files"].param_parts
+    assert not empty.static_parts
+    assert not empty.param_parts
+    assert not empty.pattern_parts
+
+    assert table.lookup("POST", "items/1/files/report.json") == (routes[1], {"item_id": 1, "name": "report"})
+    assert table.lookup("GET", "items/1/a/b") == (routes[2], {"item_id": 1, "rest": "a/b"})
+    assert table.compiled.static_edges[-1] is table.compiled.leafs[0]
+    assert not table.compiled.static_edges[-1]
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_lookup_many(routing_table, add_route, threads):
+    static_route = add_route("/health")
+    item_route = add_route("/items/{item_id:int}")
+    routing_table.prepare()
+
+    pairs = [("GET", "health"), ("GET", "items/1"), ("POST", "items/1"), ("GET", "items/x")] * 3
+
+    assert routing_table.lookup_many(iter(pairs), threads) == [
+        (static_route, {}),
+        (item_route, {"item_id": "1"}),
+        None,
+        None,
+    ] * 3
+
+
+def test_lookup_stream(routing_table, add_route):
+    route = add_route("/items/{item_id:int}")
+
+    results = lookup_stream(routing_table, (("GET", f"items/{i}") for i in range(5)), batch_size=2)
+
+    assert [*results] == [(route, {"item_id": str(i)}) for i in range(5)]
@@ -0,0 +1,140 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.convertors import StringConvertor
+from starlette.responses import PlainTextResponse
+from starlette.routing import Host, Mount, Route
+
+from fastapi_radixer import Radixer, register_param_type, unregister_param_type
+from fastapi_radixer import _radixer
+from fastapi_radixer.parser import parse_route
+
+
+async def _endpoint(_):
+    return PlainTextResponse("ok")
+
+
+def _routes():
+    return [
+        Route("/health", _endpoint, methods=["GET"]),
+        Route("/users/{user_id:int}", _endpoint, methods=["GET", "POST"]),
+        Route("/files/{name}.json", _endpoint, methods=["GET"]),
+        Route("/files/{name}.{ext}", _endpoint, methods=["GET"]),
+        Mount("/admin", routes=[Route("/stats", _endpoint)]),
+        Host("{tenant}.example.com", app=PlainTextResponse("ok")),
+    ]
+
+
+@pytest.fixture
+def factory(routing_table):
+    return type(routing_table)
+
+
+def _lookups(radixer):
+    return [
+        radixer.lookup("GET", "health"),
+        radixer.lookup("POST", "users/1"),
+        radixer.lookup("GET", "files/report.json"),
+        radixer.lookup("GET", "admin/stats"),
+        radixer.lookup("GET", "missing"),
+    ]
+
+
+def _positions(radixer, results):
+    return [None if res is None else (radixer.routes.index(res[0]), res[1]) for res in results]
+
+
+def test_snapshot_is_loaded_by_the_next_worker(factory, tmp_path, monkeypatch):
+    snapshot = tmp_path / "routes.bin"
+
+    first = Radixer(routes=_routes(), routing_table_factory=factory, snapshot=snapshot)
+    first.prepare()
+
+    assert snapshot.stat().st_size
+
+    parsed = []
+    monkeypatch.setattr(_radixer, "parse_route", lambda route: parsed.append(route) or parse_route(route))
+
+    second = Radixer(routes=_routes(), routing_table_factory=factory, snapshot=snapshot)
+    second.prepare()
+
+    # mounted routers get their own radixer, only their routes are parsed
+    assert parsed == second.routes[4].routes
+
+    assert _positions(second, _lookups(second)) == _positions(first, _lookups(first))
+    assert second.fallback_routes == [second.routes[3]]
+    assert len(second.host_table) == 1
+
+
+@pytest.mark.asyncio
+async def test_first_request_to_host_without_lifespan(factory, tmp_path):
+    snapshot = tmp_path / "routes.bin"
+    Radixer(routes=_routes(), routing_table_factory=factory, snapshot=snapshot).prepare()
+
+    # the next worker loads the snapshot on the first request
+    radixer = Radixer(routes=_routes(), routing_table_factory=factory, snapshot=snapshot)
+
+    async with AsyncClient(transport=ASGITransport(radixer), base_url="http://acme.example.com") as client:
+        response = await client.get("/anything")
+
+    assert response.status_code == 200
+    assert not radixer.deferred
+
+
+def test_stale_snapshot_is_rewritten(factory, tmp_path):
+    snapshot = tmp_path / "routes.bin"
+    Radixer(routes=_routes(), routing_table_factory=factory, snapshot=snapshot).prepare()
+    data = snapshot.read_bytes()
+
+    routes = _routes()[:2]
+    radixer = Radixer(routes=routes, routing_table_factory=factory, snapshot=snapshot)
+    radixer.prepare()
+
+    assert radixer.lookup("GET", "users/1") == (routes[1], {"user_id": 1})
+    assert radixer.lookup("GET", "files/report.json") is None
+    assert snapshot.read_bytes() != data
+
+
+def test_load_snapshot_checks_fingerprint(factory):
+    radixer = Radixer(routes=_routes(), routing_table_factory=factory)
+    data = radixer.dump_snapshot()
+
+    other = Radixer(routes=_routes()[1:], routing_table_factory=factory)
+    assert not other.load_snapshot(data)
+    assert not other.load_snapshot(b"garbage")
+
+    same = Radixer(routes=_routes(), routing_table_factory=factory)
+    assert same.load_snapshot(data)
+    assert same.lookup("GET", "users/1") == (same.routes[1], {"user_id": 1})
+
+
+def test_restored_table_accepts_new_routes(tmp_path):
+    snapshot = tmp_path / "routes.bin"
+    Radixer(routes=_routes(), snapshot=snapshot, routing_table_factory=_radixer.RoutingTable).prepare()
+
+    radixer = Radixer(routes=_routes(), snapshot=snapshot, routing_table_factory=_radixer.RoutingTable)
+    radixer.prepare()
+    radixer.add_route("/items/{item_id:int}", _endpoint, methods=["GET"])
+
+    assert radixer.lookup("GET", "items/1") == (radixer.routes[-1], {"item_id": 1})
+    assert radixer.lookup("POST", "users/1") == (radixer.routes[1], {"user_id": 1})
+
+
+class _SlugConvertor(StringConvertor):
+    pass
+
+
+def test_snapshot_of_other_settings_is_stale(factory):
+    data = Radixer(routes=_routes(), routing_table_factory=factory).dump_snapshot()
+
+    raw = Radixer(routes=_routes(), routing_table_factory=lambda: factory(convert_params=False))
+    assert not raw.load_snapshot(data)
+
+    # custom param types change how the same routes are indexed
+    register_param_type("slug", _SlugConvertor())
+
+    try:
+        assert not Radixer(routes=_routes(), routing_table_factory=factory).load_snapshot(data)
+    finally:
+        unregister_param_type("slug")
+
+    assert Radixer(routes=_routes(), routing_table_factory=factory).load_snapshot(data)
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from fastapi_radixer import NativeRoutingTable
+from fastapi_radixer.parser import parse_route
+
+
+async def _endpoint(_):
+    return PlainTextResponse("ok")
+
+
+def _hammer(routing_table):
+    routes = [Route(f"/users/{{user_id:int}}/items/{i}", _endpoint, methods=["GET"]) for i in range(50)]
+
+    for route in routes:
+        routing_table.add_route(parse_route(route))
+
+    routing_table.prepare()
+
+    def _worker(seed):
+        for i in range(2_000):
+            index = (seed + i) % len(routes)
+            route, params = routing_table.lookup("GET", f"users/{i}/items/{index}")
+
+            assert route is routes[index]
+            assert params == {"user_id": i}
+            assert routing_table.lookup("GET", f"users/{i}/missing") is None
+
+        return seed
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        assert sorted(executor.map(_worker, range(64))) == list(range(64))
+
+
+def test_shared_table_lookups_from_many_threads(routing_table):
+    _hammer(routing_table)
+
+
+@pytest.mark.skipif(NativeRoutingTable is None, reason="native extension is not built")
+def test_native_lookups_without_gil():
+    _hammer(NativeRoutingTable(release_gil=True))
+
+
+def _add_during_lookups(routing_table):
+    routes = [Route(f"/users/{{user_id:int}}/items/{i}", _endpoint, methods=["GET"]) for i in range(20)]
+    added = [Route(f"/users/{{user_id:int}}/added/{i}", _endpoint, methods=["GET"]) for i in range(200)]
+
+    for route in routes:
+        routing_table.add_route(parse_route(route))
+
+    routing_table.prepare()
+    done = threading.Event()
+
+    def _worker(seed):
+        i = 0
+
+        while not done.is_set():
+            index = (seed + i) % len(routes)
+            route, params = routing_table.lookup("GET", f"users/{i}/items/{index}")
+
+            assert route is routes[index]
+            assert params == {"user_id": i}
+
+            # a route is either not added yet or fully added
+            if res := routing_table.lookup("GET", f"users/{i}/added/{i % len(added)}"):
+                assert res == (added[i % len(added)], {"user_id": i})
+
+            i += 1
+
+        return seed
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(_worker, seed) for seed in range(8)]
+
+        try:
+            for route in added:
+                routing_table.add_route(parse_route(route))
+        finally:
+            done.set()
+
+        assert [future.result() for future in futures] == list(range(8))
+
+    assert routing_table.lookup("GET", "users/1/added/199") == (added[-1], {"user_id": 1})
+
+
+def test_routes_added_during_lookups(routing_table):
+    _add_during_lookups(routing_table)
+
+
+@pytest.mark.skipif(NativeRoutingTable is None, reason="native extension is not built")
+def test_native_routes_added_during_lookups_without_gil():
+    _add_during_lookups(NativeRoutingTable(release_gil=True))
@@ -0,0 +1,124 @@
+import pytest
+from fastapi import status
+from fastapi.routing import APIRoute
+from starlette.routing import Route, Router
+
+from fastapi_radixer import Radixer, RoutingTable, create_cache
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _get_item(item_id: int):
+    return {"item_id": item_id}
+
+
+async def _get_item_v2(item_id: int):
+    return {"item_id": item_id, "version": 2}
+
+
+async def _get_tag(tag: str):
+    return {"tag": tag}
+
+
+@pytest.fixture
+def rebuilds(radixer):
+    infos = []
+    radixer.on_rebuild = infos.append
+    return infos
+
+
+@pytest.fixture
+def item_route(radixer_app, radixer):
+    radixer.fallback = False
+
+    @radixer_app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    return radixer.routes[-1]
+
+
+async def test_add_and_remove_routes(radixer, item_route, rebuilds, client):
+    tag_route = APIRoute("/tags/{tag}", _get_tag, methods=["GET"])
+    old_table = radixer.routing_table
+
+    info = radixer.update_routes(add=[tag_route])
+
+    assert radixer.routing_table is not old_table
+    assert rebuilds == [info]
+    assert info.fallback == 0
+    assert info.routes == info.indexed == len(radixer.routes)
+    assert info.duration >= 0
+
+    response = await client.get("/tags/new")
+    assert response.json() == {"tag": "new"}
+
+    radixer.update_routes(remove=[item_route])
+
+    response = await client.get("/items/1")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert item_route not in radixer.routes
+
+
+async def test_replace_routes(radixer, item_route, client):
+    new_route = APIRoute("/items/{item_id}", _get_item_v2, methods=["GET"])
+
+    radixer.update_routes(replace=[(item_route, new_route)])
+
+    response = await client.get("/items/1")
+    assert response.json() == {"item_id": 1, "version": 2}
+    assert radixer.routes.count(new_route) == 1
+
+
+async def test_update_routes_async(radixer, item_route, rebuilds, client):
+    response = await client.get("/items/1")
+    assert response.json() == {"item_id": 1}
+
+    new_route = APIRoute("/items/{item_id}", _get_item, methods=["POST"])
+    info = await radixer.update_routes_async(add=[new_route], remove=[item_route])
+
+    assert rebuilds == [info]
+
+    response = await client.post("/items/2")
+    assert response.json() == {"item_id": 2}
+
+    response = await client.get("/items/2")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+async def test_rebuild_publishes_one_state(radixer, item_route):
+    old_state = radixer.state
+
+    radixer.update_routes(add=[APIRoute("/tags/{tag}", _get_tag, methods=["GET"])])
+    state = radixer.state
+
+    assert state.routing_table is not old_state.routing_table
+    assert state.host_table is not old_state.host_table
+    assert state.fallback_router is not old_state.fallback_router
+    assert state.lookup == state.routing_table.lookup
+
+    # requests that already read the old state keep routing by its tables
+    assert old_state.routing_table.lookup("GET", "tags/new") is None
+    assert state.lookup("GET", "tags/new") is not None
+
+
+async def test_rebuilt_tables_keep_settings(routing_table):
+    radixer = Radixer(routing_table=type(routing_table)(convert_params=False))
+    radixer.add_api_route("/items/{item_id}", _get_item, methods=["GET"])
+    radixer.mount("/sub", Router(routes=[Route("/items/{item_id:int}", _get_item)]))
+
+    radixer.update_routes(add=[APIRoute("/tags/{tag}", _get_tag, methods=["GET"])])
+
+    assert radixer.lookup("GET", "items/1")[1] == {"item_id": "1"}
+    assert radixer.routes[1].app.lookup("GET", "items/1")[1] == {"item_id": "1"}
+
+
+async def test_rebuilt_python_table_gets_own_cache():
+    table = RoutingTable(cache=create_cache(16, policy="clock"), negative_cache=create_cache(16))
+    radixer = Radixer(routing_table=table)
+    radixer.update_routes(add=[APIRoute("/tags/{tag}", _get_tag, methods=["GET"])])
+
+    assert radixer.routing_table is not table
+    assert type(radixer.routing_table.cache) is type(table.cache)
+    assert radixer.routing_table.cache is not table.cache
+    assert radixer.routing_table.negative_cache.capacity == table.negative_cache.capacity